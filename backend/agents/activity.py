@@ -0,0 +1,75 @@
+from typing import Dict, Any, List
+import atexit
+import os
+import queue
+import threading
+from telemetry import registry
+
+ACTIVITY_DROPPED = registry.counter(
+    "agent_activity_dropped_total", "Agent activity entries dropped because the persistence queue was full.")
+
+
+class ActivityLogWriter:
+    """
+    Persists agent activity to the SQLite `agent_activity` table off the request path.
+    Entries are buffered in a bounded queue and written in batches by one daemon thread,
+    so agents never block on disk and memory stays flat if the database falls behind.
+    """
+    def __init__(self):
+        self.flush_interval = float(os.getenv("AGENT_ACTIVITY_FLUSH_INTERVAL", "2.0"))
+        self.batch_size = int(os.getenv("AGENT_ACTIVITY_BATCH_SIZE", "500"))
+        self._queue = queue.Queue(maxsize=int(os.getenv("AGENT_ACTIVITY_QUEUE_SIZE", "10000")))
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def record(self, entry: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            ACTIVITY_DROPPED.labels().inc()
+            return
+        self._ensure_started()
+
+    def flush(self):
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="agent-activity-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write([first] + self._drain(self.batch_size - 1))
+
+    def _drain(self, limit: int = None) -> List[Dict[str, Any]]:
+        limit = self.batch_size if limit is None else limit
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            # Imported lazily: agents are usable without the database module (e.g. benchmarks)
+            from database import db
+            db.log_agent_activity(batch)
+        except Exception as e:
+            print(f"[ActivityLogWriter] Failed to persist {len(batch)} activity entries: {e}")
+
+activity_log = ActivityLogWriter()
@@ -0,0 +1,115 @@
+"""
+Vectorized budget allocation under diminishing returns.
+
+Each channel (a campaign on a platform) gets a concave revenue curve
+    R_i(x) = a_i * s_i * ln(1 + x / s_i)
+calibrated so that R_i(spend_i) equals the revenue observed at its current spend (roi_i * spend_i).
+s_i is the saturation scale: its current spend, or a quarter of an even split for channels that have
+not spent yet. For every campaign (group), the allocation maximizing sum R_i(x_i) subject to
+sum x_i = budget and lo_i <= x_i <= hi_i satisfies R_i'(x_i) = lambda. That gives
+x_i = clip(s_i * (a_i / lambda - 1), lo_i, hi_i), and lambda is found by bisection for all groups at once.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+
+BISECTION_STEPS = 100
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray, default) -> np.ndarray:
+    out = np.broadcast_to(np.asarray(default, dtype=float), np.shape(numerator)).copy()
+    return np.divide(numerator, denominator, out=out, where=denominator > 0)
+
+
+def _group_sum(values: np.ndarray, group: np.ndarray, groups: int) -> np.ndarray:
+    return np.bincount(group, weights=values, minlength=groups)
+
+
+def _solve_lambda(a, s, lo, hi, group, groups, target, measure, lam_low, lam_high):
+    """Bisects (in log space) the per-group lambda at which `measure(x)` summed per group hits `target`."""
+    for _ in range(BISECTION_STEPS):
+        lam = np.sqrt(lam_low * lam_high)
+        x = np.clip(s * (a / lam[group] - 1.0), lo, hi)
+        too_much = _group_sum(measure(x), group, groups) > target
+        # The measure falls as lambda rises: overshooting groups move their lower bound up
+        lam_low = np.where(too_much, lam, lam_low)
+        lam_high = np.where(too_much, lam_high, lam)
+    lam = np.sqrt(lam_low * lam_high)
+    return np.clip(s * (a / lam[group] - 1.0), lo, hi)
+
+
+def allocate(budget, spend, roi, group: Optional[np.ndarray] = None, conversions=None, cpc=None,
+             min_share: float = 0.05, max_share: float = 0.8) -> Dict[str, np.ndarray]:
+    """
+    Optimal split of each group's `budget` across its channels.
+    `spend`, `roi`, `conversions`, `cpc` and `group` (0..G-1) are per channel; `budget` is per group.
+    Channel bounds are `min_share`/`max_share` of the group budget, relaxed when infeasible.
+
+    Per channel it returns current_allocation, allocation, current_revenue, revenue and conversions.
+    Per group it returns revenue_current, revenue_optimized, min_budget (the least spend that still
+    reaches the current revenue), savings and bounds_relaxed (the requested shares were infeasible).
+    """
+    spend = np.maximum(np.asarray(spend, dtype=float), 0.0)
+    roi = np.maximum(np.asarray(roi, dtype=float), 0.0)
+    n = spend.size
+    group = np.zeros(n, dtype=np.int64) if group is None else np.asarray(group, dtype=np.int64)
+    budget = np.atleast_1d(np.asarray(budget, dtype=float))
+    groups = budget.size
+
+    count = np.bincount(group, minlength=groups).astype(float)
+    group_budget = budget[group]
+    fair = group_budget / np.maximum(count[group], 1.0)
+    s = np.maximum(spend, np.maximum(fair / 4.0, 1e-9))
+    # a_i such that R_i(spend_i) = roi_i * spend_i (limit a_i -> roi_i for channels with no spend yet)
+    a = _safe_divide(roi * spend, s * np.log1p(spend / s), roi)
+
+    share_lo = np.minimum(min_share, 1.0 / np.maximum(count, 1.0))
+    share_hi = np.where(count * max_share < 1.0, 1.0, max_share)
+    bounds_relaxed = (count * min_share > 1.0) | (count * max_share < 1.0)
+    lo = share_lo[group] * group_budget
+    hi = np.maximum(share_hi[group] * group_budget, lo)
+
+    def revenue(x):
+        return a * s * np.log1p(x / s)
+
+    # Current split: budget spread in proportion to what each channel has spent so far
+    spent_total = _group_sum(spend, group, groups)
+    current = _safe_divide(group_budget * spend, spent_total[group], fair)
+
+    a_max = np.full(groups, 1e-12)
+    np.maximum.at(a_max, group, a)
+    lam_low, lam_high = np.full(groups, 1e-12), a_max * 2.0 + 1e-12
+
+    allocation = _solve_lambda(a, s, lo, hi, group, groups, budget, lambda x: x, lam_low, lam_high)
+    # Groups whose channels all have zero marginal return stop at their floors; spread the rest by headroom
+    leftover = budget - _group_sum(allocation, group, groups)
+    leftover = np.where(leftover > budget * 1e-9, leftover, 0.0)
+    headroom = hi - allocation
+    allocation = allocation + _safe_divide(leftover[group] * headroom, _group_sum(headroom, group, groups)[group], 0.0)
+    current_revenue = revenue(current)
+    optimized_revenue = revenue(allocation)
+    revenue_current = _group_sum(current_revenue, group, groups)
+    revenue_optimized = _group_sum(optimized_revenue, group, groups)
+
+    # Least budget whose optimal split still earns the current revenue (no floor, same per-channel caps)
+    cheapest = _solve_lambda(a, s, 0.0, hi, group, groups, revenue_current, revenue, lam_low, lam_high)
+    min_budget = np.minimum(_group_sum(cheapest, group, groups), budget)
+
+    conversions = np.zeros(n) if conversions is None else np.asarray(conversions, dtype=float)
+    observed_revenue = roi * spend
+    per_revenue = _safe_divide(conversions, observed_revenue, 0.0)
+    cpc = np.zeros(n) if cpc is None else np.asarray(cpc, dtype=float)
+
+    return {
+        "current_allocation": current,
+        "allocation": allocation,
+        "current_revenue": current_revenue,
+        "revenue": optimized_revenue,
+        "conversions": per_revenue * optimized_revenue,
+        "clicks": _safe_divide(allocation, cpc, 0.0),
+        "revenue_current": revenue_current,
+        "revenue_optimized": revenue_optimized,
+        "min_budget": min_budget,
+        "savings": np.maximum(budget - min_budget, 0.0),
+        "bounds_relaxed": bounds_relaxed,
+    }
@@ -0,0 +1,211 @@
+"""
+Vectorized analysis engine shared by InsightsAgent and StrategyAgent.
+Platform rows are loaded once into a pandas frame and every derived metric
+(revenue, efficiency/growth scores, thresholds, rankings) is computed column-wise.
+"""
+
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ["cost", "roi", "cpc", "ctr", "conversions"]
+
+# Thresholds used by the cost/growth analyses
+UNDERPERFORMING_ROI = 1.5
+UNDERPERFORMING_CTR = 1.0
+HIGH_PERFORMER_ROI = 2.0
+HIGH_PERFORMER_CTR = 1.5
+HIGH_SCALING_ROI = 2.0
+HIGH_SCALING_CTR = 2.0
+MEDIUM_SCALING_ROI = 1.5
+
+# Per-row "source value was an int" flags kept alongside columns that mix ints and floats
+INT_MASK_PREFIX = "_int_"
+
+
+def _column(values: List[Any]) -> np.ndarray:
+    """Keeps integer columns integral so totals and echoed values match the source data."""
+    arr = np.array(values)
+    if arr.dtype.kind == "i":
+        return arr.astype(np.int64, copy=False)
+    return arr.astype(np.float64)
+
+
+def _int_mask(values: List[Any]) -> np.ndarray:
+    return np.fromiter((type(v) is int for v in values), dtype=bool, count=len(values))
+
+
+def build_frame(platforms_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    """One row per platform entry with numeric metric columns and derived revenue."""
+    if not platforms_data:
+        return pd.DataFrame(columns=["platform", "campaign_id", *METRIC_COLUMNS, "revenue"])
+    metrics = [p.get("metrics", {}) for p in platforms_data]
+    columns = {
+        "platform": [p.get("platform", "Unknown") for p in platforms_data],
+        "campaign_id": [p.get("campaign_id") for p in platforms_data],
+    }
+    for col in METRIC_COLUMNS:
+        values = [m.get(col, 0) for m in metrics]
+        columns[col] = _column(values)
+        if columns[col].dtype.kind == "f":
+            # A float column may still hold some ints; records echo those back as ints
+            mask = _int_mask(values)
+            if mask.any():
+                columns[INT_MASK_PREFIX + col] = mask
+    frame = pd.DataFrame(columns)
+    frame["revenue"] = frame["cost"] * frame["roi"]
+    return frame
+
+
+def _total(values) -> Any:
+    """Left-to-right sum (cumsum is sequential), matching Python's sum() bit for bit."""
+    arr = np.asarray(values)
+    if arr.size == 0:
+        return 0
+    return arr.cumsum()[-1].item()
+
+
+def _records(frame: pd.DataFrame, columns: List[str], order: np.ndarray = None) -> List[Dict[str, Any]]:
+    arrays = [frame[col].to_numpy() for col in columns]
+    if order is not None:
+        arrays = [arr[order] for arr in arrays]
+    values = [arr.tolist() for arr in arrays]
+    for i, col in enumerate(columns):
+        if INT_MASK_PREFIX + col in frame:
+            mask = frame[INT_MASK_PREFIX + col].to_numpy()
+            mask = mask[order] if order is not None else mask
+            values[i] = [int(v) if is_int else v for v, is_int in zip(values[i], mask)]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _rank_desc(scores: np.ndarray) -> np.ndarray:
+    # Stable, so ties keep input order exactly like list.sort(reverse=True)
+    return np.argsort(-scores, kind="stable")
+
+
+def cost_efficiency(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Cost per conversion, efficiency ranking and waste estimate."""
+    if frame.empty:
+        return {"error": "No data available"}
+
+    cost = frame["cost"].to_numpy(dtype=np.float64)
+    conversions = frame["conversions"].to_numpy()
+    roi = frame["roi"].to_numpy(dtype=np.float64)
+    ctr = frame["ctr"].to_numpy(dtype=np.float64)
+    cpc = frame["cpc"].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cost_per_conversion = np.where(conversions > 0, cost / np.where(conversions > 0, conversions, 1), np.inf)
+        efficiency_score = np.where(cpc > 0, (roi * ctr) / np.where(cpc > 0, cpc, 1), 0.0)
+
+    ranked = frame.assign(
+        cost_per_conversion=cost_per_conversion,
+        efficiency_score=efficiency_score,
+        is_underperforming=(roi < UNDERPERFORMING_ROI) | (ctr < UNDERPERFORMING_CTR)
+    )
+    order = _rank_desc(efficiency_score)
+    platform_efficiency = _records(ranked, [
+        "platform", "cost", "conversions", "cost_per_conversion", "efficiency_score",
+        "roi", "cpc", "ctr", "is_underperforming"
+    ], order)
+    underperforming_mask = ranked["is_underperforming"].to_numpy()[order]
+
+    total_spend = _total(frame["cost"].to_numpy())
+    total_conversions = _total(conversions)
+    return {
+        "total_spend": total_spend,
+        "total_conversions": total_conversions,
+        "avg_cost_per_conversion": total_spend / total_conversions if total_conversions > 0 else 0,
+        "platform_efficiency": platform_efficiency,
+        "underperforming_platforms": [p for p, flag in zip(platform_efficiency, underperforming_mask) if flag],
+        "waste_estimate": _total(frame["cost"].to_numpy()[order][underperforming_mask])
+    }
+
+
+def growth_opportunities(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Growth scores, scaling potential and revenue opportunity ranking."""
+    if frame.empty:
+        return {"error": "No data available"}
+
+    roi = frame["roi"].to_numpy(dtype=np.float64)
+    ctr = frame["ctr"].to_numpy(dtype=np.float64)
+    revenue = frame["revenue"].to_numpy()
+
+    growth_score = roi * ctr * (frame["conversions"].to_numpy() / 100)
+    scaling_potential = np.select(
+        [(roi > HIGH_SCALING_ROI) & (ctr > HIGH_SCALING_CTR), roi > MEDIUM_SCALING_ROI],
+        ["High", "Medium"], default="Low"
+    )
+    is_high_performer = (roi > HIGH_PERFORMER_ROI) & (ctr > HIGH_PERFORMER_CTR)
+
+    ranked = frame.rename(columns={"revenue": "current_revenue"}).assign(
+        growth_score=growth_score,
+        scaling_potential=scaling_potential,
+        is_high_performer=is_high_performer
+    )
+    order = _rank_desc(growth_score)
+    platform_opportunities = _records(ranked, [
+        "platform", "current_revenue", "roi", "ctr", "conversions",
+        "growth_score", "scaling_potential", "is_high_performer"
+    ], order)
+    high_mask = is_high_performer[order]
+    scaling_mask = scaling_potential[order] == "High"
+
+    return {
+        "total_revenue": _total(revenue),
+        "platform_opportunities": platform_opportunities,
+        "high_performers": [p for p, flag in zip(platform_opportunities, high_mask) if flag],
+        "scaling_candidates": [p for p, flag in zip(platform_opportunities, scaling_mask) if flag],
+        "revenue_opportunity": _total(revenue[order][high_mask] * 0.4)
+    }
+
+
+def performance_summary(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Totals plus best ROI / worst CPC / highest CTR leaders and performance buckets."""
+    if frame.empty:
+        return {"error": "No data available"}
+
+    roi = frame["roi"].to_numpy(dtype=np.float64)
+    ctr = frame["ctr"].to_numpy(dtype=np.float64)
+    cpc = frame["cpc"].to_numpy(dtype=np.float64)
+
+    platform_performance = _records(frame, ["platform", "cost", "roi", "cpc", "ctr", "conversions", "revenue"])
+
+    # The first row always seeds the worst-CPC tracker; later rows only win with a positive CPC
+    cpc_candidates = np.where(cpc > 0, cpc, -np.inf)
+    cpc_candidates[0] = cpc[0]
+
+    best_roi = platform_performance[int(np.argmax(roi))]
+    worst_cpc = platform_performance[int(np.argmax(cpc_candidates))]
+    highest_ctr = platform_performance[int(np.argmax(ctr))]
+
+    total_spend = _total(frame["cost"].to_numpy())
+    total_revenue = _total(frame["revenue"].to_numpy())
+    return {
+        "total_platforms": len(frame),
+        "platform_performance": platform_performance,
+        "cost_insights": {
+            "total_spend": total_spend,
+            "avg_roi": total_revenue / total_spend if total_spend > 0 else 0,
+            "worst_cpc_platform": worst_cpc["platform"],
+            "underperforming_platforms": [p for p, flag in zip(platform_performance, roi < UNDERPERFORMING_ROI) if flag]
+        },
+        "optimization_opportunities": {
+            "best_roi_platform": best_roi["platform"],
+            "highest_ctr_platform": highest_ctr["platform"],
+            "high_performers": [p for p, flag in zip(platform_performance, roi > HIGH_PERFORMER_ROI) if flag]
+        }
+    }
+
+
+def rollup(frame: pd.DataFrame, by: str = "platform") -> List[Dict[str, Any]]:
+    """Group-by totals (spend, revenue, conversions, blended ROI) per platform or campaign_id."""
+    if frame.empty:
+        return []
+    grouped = frame.groupby(by, sort=False).agg(
+        spend=("cost", "sum"), revenue=("revenue", "sum"), conversions=("conversions", "sum"), rows=("cost", "size")
+    ).reset_index()
+    spend = grouped["spend"].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grouped["roi"] = np.where(spend > 0, grouped["revenue"].to_numpy() / np.where(spend > 0, spend, 1), 0.0)
+    return _records(grouped, [by, "spend", "revenue", "conversions", "roi", "rows"])
@@ -1,43 +1,137 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 import os
+import copy
 import json
+import time
+from collections import deque
+from datetime import datetime
 from openai import OpenAI
 from dotenv import load_dotenv
+from telemetry import registry, TOKEN_BUCKETS
+from .activity import activity_log
+from .ratelimit import llm_limiter, current_priority, estimate_tokens, RateLimited
 
 load_dotenv()
 
 # Configure OpenAI
 api_key = os.getenv("OPENAI_API_KEY")
+# Point at a compatible server (e.g. llm_stub_server.py) for offline benchmarks
+base_url = os.getenv("OPENAI_BASE_URL")
 client = None
-if api_key:
-    client = OpenAI(api_key=api_key)
+if api_key or base_url:
+    client = OpenAI(api_key=api_key or "stub-key", base_url=base_url)
+
+# Recent activity kept in memory per agent; the full history is persisted to SQLite
+AGENT_MEMORY_SIZE = int(os.getenv("AGENT_MEMORY_SIZE", "100"))
+
+# --- Telemetry (exposed on /metrics) ---
+LLM_LATENCY = registry.histogram(
+    "agent_llm_request_duration_seconds", "Wall time of agent LLM calls, including fallbacks.",
+    ["agent", "model", "method", "outcome"])
+LLM_PROMPT_TOKENS = registry.histogram(
+    "agent_llm_prompt_tokens", "Prompt tokens reported by the LLM API per call.",
+    ["agent", "model"], buckets=TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = registry.histogram(
+    "agent_llm_completion_tokens", "Completion tokens reported by the LLM API per call.",
+    ["agent", "model"], buckets=TOKEN_BUCKETS)
+LLM_JSON_PARSE_FAILURES = registry.counter(
+    "agent_llm_json_parse_failures_total", "LLM replies that could not be parsed as JSON.",
+    ["agent", "model"])
+LLM_FALLBACKS = registry.counter(
+    "agent_llm_fallbacks_total", "Agent calls answered from the simulated fallback.",
+    ["agent", "model", "method", "reason"])
+
+# Resilient fallback for demo covering all agent needs
+FALLBACK_RESPONSE = {
+    "error": "LLM call failed",
+    # Planner
+    "strategy": "Simulated Strategic Node: AI-driven optimization enabled.",
+    "milestones": ["Initiation", "Market Penetration", "Scale", "Review"],
+    "priority": "High",
+    # Recommender
+    "platform_split": {"Instagram": 0.4, "Facebook": 0.3, "Google Ads": 0.3},
+    "reasoning": "Historical data suggests high engagement on visual platforms for this objective.",
+    # ROI Analyst
+    "projected_roi": 2.8,
+    "projected_revenue": 140000.0,
+    "projected_conversions": 350,
+    "confidence_score": "88%",
+    # Timeline
+    "execution_timeline": [
+        {"milestone": "Phase 1: Launch", "date": "2024-01-01"},
+        {"milestone": "Phase 2: Optimization", "date": "2024-01-10"},
+        {"milestone": "Phase 3: Scaling", "date": "2024-01-20"},
+        {"milestone": "Phase 4: Review", "date": "2024-01-30"}
+    ],
+    "duration_days": 30,
+    # Orchestrator
+    "new_status": "Active",
+    "ai_confirmation": "Command authorized. Node status updated to Active.",
+    # Consistency
+    "consistency_score": 0.95,
+    "audit_note": "Brand voice is consistent across all channels.",
+    "status": "Green"
+}
 
 class BaseAgent(ABC):
+    # Rate-limit class for this agent's LLM calls; an llm_priority() scope overrides it
+    priority = "interactive"
+
     def __init__(self, name: str, role: str):
         self.name = name
         self.role = role
-        self.memory = []
+        self.memory = deque(maxlen=AGENT_MEMORY_SIZE)
         self.model_name = 'gpt-4o-mini'
 
     @abstractmethod
     def run(self, input_data: Any) -> Dict[str, Any]:
         pass
 
+    def _record_usage(self, response, charged: int = 0):
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_PROMPT_TOKENS.labels(self.name, self.model_name).observe(usage.prompt_tokens or 0)
+            LLM_COMPLETION_TOKENS.labels(self.name, self.model_name).observe(usage.completion_tokens or 0)
+            llm_limiter.settle(charged, (usage.prompt_tokens or 0) + (usage.completion_tokens or 0))
+
+    def _complete(self, prompt: str, max_tokens: int):
+        """Admits the call through the shared rate limiter, then sends it to the LLM API."""
+        charged = llm_limiter.acquire(estimate_tokens(prompt, max_tokens), current_priority(self.priority))
+        response = client.chat.completions.create(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens
+        )
+        self._record_usage(response, charged)
+        return response
+
+    def _record_call(self, method: str, started: float, fallback_reason: str = None):
+        outcome = "fallback" if fallback_reason else "success"
+        LLM_LATENCY.labels(self.name, self.model_name, method, outcome).observe(time.perf_counter() - started)
+        if fallback_reason:
+            LLM_FALLBACKS.labels(self.name, self.model_name, method, fallback_reason).inc()
+
     def generate_text(self, prompt: str) -> str:
         """Safe wrapper for text generation."""
+        started = time.perf_counter()
+        reason = "api_error"
         try:
             if not client:
+                reason = "no_client"
                 raise Exception("No API client available")
             
-            response = client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000
-            )
-            return response.choices[0].message.content.strip()
+            response = self._complete(prompt, 1000)
+            text = response.choices[0].message.content.strip()
+            self._record_call("generate_text", started)
+            return text
+        except RateLimited as e:
+            print(f"[{self.name}] Rate limited: {e}")
+            self._record_call("generate_text", started, "rate_limited")
+            return "AI Signal: Synchronization complete (Simulated Confirmation)."
         except Exception as e:
             print(f"[{self.name}] Error generating text: {e}")
+            self._record_call("generate_text", started, reason)
             return "AI Signal: Synchronization complete (Simulated Confirmation)."
 
     def call_llm(self, prompt: str, schema: str = None) -> Dict[str, Any]:
@@ -46,54 +140,37 @@ class BaseAgent(ABC):
         if schema:
             full_prompt += f"\n\nReturn the response in strictly valid JSON format matching this schema: {schema}. Do not include any markdown formatting or extra text."
 
+        started = time.perf_counter()
+        reason = "api_error"
         try:
             # Check for valid client
             if not client:
+                reason = "no_client"
                 raise Exception("No API client available")
 
-            response = client.chat.completions.create(
-                model=self.model_name,
-                messages=[{"role": "user", "content": full_prompt}],
-                max_tokens=1500
-            )
+            response = self._complete(full_prompt, 1500)
             
             # Remove markdown backticks if present
             clean_text = response.choices[0].message.content.replace('```json', '').replace('```', '').strip()
-            return json.loads(clean_text)
+            try:
+                result = json.loads(clean_text)
+            except json.JSONDecodeError:
+                reason = "json_parse"
+                LLM_JSON_PARSE_FAILURES.labels(self.name, self.model_name).inc()
+                raise
+            self._record_call("call_llm", started)
+            return result
+        except RateLimited as e:
+            print(f"[{self.name}] Rate limited: {e}")
+            self._record_call("call_llm", started, "rate_limited")
+            return copy.deepcopy(FALLBACK_RESPONSE)
         except Exception as e:
             print(f"[{self.name}] Error calling LLM: {e}")
-            # Resilient fallback for demo covering all agent needs
-            return {
-                "error": "LLM call failed",
-                # Planner
-                "strategy": "Simulated Strategic Node: AI-driven optimization enabled.",
-                "milestones": ["Initiation", "Market Penetration", "Scale", "Review"],
-                "priority": "High",
-                # Recommender
-                "platform_split": {"Instagram": 0.4, "Facebook": 0.3, "Google Ads": 0.3},
-                "reasoning": "Historical data suggests high engagement on visual platforms for this objective.",
-                # ROI Analyst
-                "projected_roi": 2.8,
-                "projected_revenue": 140000.0,
-                "projected_conversions": 350,
-                "confidence_score": "88%",
-                # Timeline
-                "execution_timeline": [
-                    {"milestone": "Phase 1: Launch", "date": "2024-01-01"},
-                    {"milestone": "Phase 2: Optimization", "date": "2024-01-10"},
-                    {"milestone": "Phase 3: Scaling", "date": "2024-01-20"},
-                    {"milestone": "Phase 4: Review", "date": "2024-01-30"}
-                ],
-                "duration_days": 30,
-                # Orchestrator
-                "new_status": "Active",
-                "ai_confirmation": "Command authorized. Node status updated to Active.",
-                # Consistency
-                "consistency_score": 0.95,
-                "audit_note": "Brand voice is consistent across all channels.",
-                "status": "Green"
-            }
+            self._record_call("call_llm", started, reason)
+            return copy.deepcopy(FALLBACK_RESPONSE)
 
     def log_activity(self, message: str):
         print(f"[{self.role}] {self.name}: {message}")
-        self.memory.append({"message": message, "timestamp": None})
+        entry = {"agent": self.name, "role": self.role, "message": message, "timestamp": datetime.now().isoformat()}
+        self.memory.append(entry)
+        activity_log.record(entry)
@@ -4,6 +4,8 @@ import random
 
 class ExecutionAgent(BaseAgent):
     """Simulates the broadcasting of campaign assets with a Gemini-generated confirmation."""
+    priority = "background"
+
     def __init__(self):
         super().__init__(name="Broadcast", role="Execution Lead")
 
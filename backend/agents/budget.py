@@ -1,28 +1,157 @@
 from .base import BaseAgent
-from typing import Dict, Any, List
+from .allocation import allocate
+from typing import Dict, Any, List, Optional
+import os
+import numpy as np
+
+ALLOCATION_PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+
 
 class BudgetOptimizerAgent(BaseAgent):
-    """Reallocates budget dynamically to maximize ROI based on real-time signals."""
+    """
+    Reallocates budget to maximize ROI based on real-time signals.
+    The split is solved numerically (see allocation.py); the LLM only narrates the result.
+    """
     def __init__(self):
         super().__init__(name="Ledger", role="Capital Allocator")
 
     def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        current_budget = input_data.get("current_budget", 0)
-        platforms = input_data.get("platform_breakdown", {})
-        
+        min_share = float(input_data.get("min_share", 0.05))
+        max_share = float(input_data.get("max_share", 0.8))
+        if min_share > max_share:
+            raise ValueError("min_share cannot exceed max_share")
+        channels = self._channels(input_data)
+        current_budget = float(input_data.get("current_budget") or 0) or sum(c["spend"] for c in channels)
+
+        if not channels or current_budget <= 0:
+            return {
+                "action": "No Reallocation",
+                "justification": "No platform spend data available to optimize.",
+                "savings_projected": "0.00",
+                "new_allocation_signal": "Not sent"
+            }
+
+        result = allocate(
+            current_budget,
+            [c["spend"] for c in channels], [c["roi"] for c in channels],
+            conversions=[c["conversions"] for c in channels], cpc=[c["cpc"] for c in channels],
+            min_share=min_share, max_share=max_share
+        )
+        allocation = {
+            c["platform"]: {
+                "current": round(float(result["current_allocation"][i]), 2),
+                "recommended": round(float(result["allocation"][i]), 2),
+                "change": round(float(result["allocation"][i] - result["current_allocation"][i]), 2),
+                "projected_revenue": round(float(result["revenue"][i]), 2),
+                "projected_conversions": int(round(float(result["conversions"][i])))
+            }
+            for i, c in enumerate(channels)
+        }
+        summary = {
+            "budget": round(current_budget, 2),
+            "revenue_current": round(float(result["revenue_current"][0]), 2),
+            "revenue_optimized": round(float(result["revenue_optimized"][0]), 2),
+            "minimum_budget_for_current_revenue": round(float(result["min_budget"][0]), 2),
+            "savings": round(float(result["savings"][0]), 2)
+        }
+        relaxed = bool(result["bounds_relaxed"][0])
+        change = summary["revenue_optimized"] - summary["revenue_current"]
+        trend = "rises" if change > 0 else "falls" if change < 0 else "stays the same"
+        bounds_note = (f"The requested share bounds ({min_share:.0%}-{max_share:.0%} per platform) cannot hold across "
+                       f"{len(channels)} platforms, so they were relaxed to what is feasible.") if relaxed else ""
+
+        lines = "\n".join(f"- {p}: {a['current']} -> {a['recommended']} (projected revenue {a['projected_revenue']})"
+                          for p, a in allocation.items())
         prompt = f"""
-        Optimize a marketing budget of {current_budget}.
-        Current allocation: {platforms}
-        
-        Goal: Reduce wasted spend and increase result spread.
-        Return a short justification for a reallocation.
+        A budget optimizer has already computed this reallocation of a marketing budget of {summary['budget']}:
+        {lines}
+        Projected revenue {trend} from {summary['revenue_current']} to {summary['revenue_optimized']}.
+        {bounds_note}
+        The current revenue could be kept with {summary['minimum_budget_for_current_revenue']}, saving {summary['savings']}.
+
+        In 2-3 sentences, justify this reallocation for a marketing manager. Do not change or invent any numbers.
         """
-        
         justification = self.generate_text(prompt)
-        
+
         return {
             "action": "Reallocation Triggered",
             "justification": justification,
-            "savings_projected": f"{current_budget * 0.12:.2f}",
-            "new_allocation_signal": "Sent to Orchestrator"
+            "savings_projected": f"{summary['savings']:.2f}",
+            "new_allocation_signal": "Sent to Orchestrator",
+            "allocation": allocation,
+            "projection": summary,
+            "constraints": {"min_share": min_share, "max_share": max_share, "relaxed": relaxed}
+        }
+
+    def allocate_portfolio(self, campaign_ids: Optional[List[str]] = None, min_share: float = 0.05,
+                           max_share: float = 0.8) -> List[Dict[str, Any]]:
+        """Optimal platform split of every campaign's budget in one vectorized solve (no LLM calls)."""
+        from database import db
+        from platforms import PlatformAPI
+
+        campaigns = db.get_campaigns_by_ids(campaign_ids) if campaign_ids else db.get_campaigns()
+        index = PlatformAPI.get_platforms_data_index()
+        rows, budgets, owners = [], [], []
+        for campaign in campaigns:
+            channels = [self._channel(d["platform"], d["metrics"]) for d in index.get(campaign["id"], [])]
+            if not channels:
+                continue
+            budgets.append(float(campaign.get("budget") or 0) or sum(c["spend"] for c in channels))
+            owners.append(campaign)
+            rows.extend((len(owners) - 1, c) for c in channels)
+        if not rows:
+            return []
+
+        group = np.array([g for g, _ in rows])
+        result = allocate(
+            budgets, [c["spend"] for _, c in rows], [c["roi"] for _, c in rows], group=group,
+            conversions=[c["conversions"] for _, c in rows], cpc=[c["cpc"] for _, c in rows],
+            min_share=min_share, max_share=max_share
+        )
+        portfolio = [{
+            "campaign_id": c["id"], "name": c["name"], "budget": round(budgets[g], 2), "allocation": {},
+            "revenue_current": round(float(result["revenue_current"][g]), 2),
+            "revenue_optimized": round(float(result["revenue_optimized"][g]), 2),
+            "savings": round(float(result["savings"][g]), 2),
+            "bounds_relaxed": bool(result["bounds_relaxed"][g])
+        } for g, c in enumerate(owners)]
+        for i, (g, channel) in enumerate(rows):
+            portfolio[g]["allocation"][channel["platform"]] = round(float(result["allocation"][i]), 2)
+        return portfolio
+
+    def _channels(self, input_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Per-platform response curves: the campaign's own platform metrics, else platform-wide aggregates."""
+        from platforms import DATA_DIR, PlatformAPI
+
+        campaign_id = input_data.get("campaign_id")
+        if campaign_id:
+            return [self._channel(d["platform"], d["metrics"]) for d in PlatformAPI.get_all_platforms_data(campaign_id)]
+
+        breakdown = input_data.get("platform_breakdown") or {}
+        platforms = list(breakdown) if breakdown else ALLOCATION_PLATFORMS
+        unknown = [p for p in platforms if not os.path.isfile(os.path.join(DATA_DIR, f"{p}.json"))]
+        if unknown:
+            # A platform without a registry has no response curve; solving it as zero-return would just defund it
+            raise ValueError(f"No platform data for {', '.join(map(str, unknown))}")
+        channels = []
+        for p in platforms:
+            channel = self._channel(p, PlatformAPI.get_platform_aggregate_stats(p)["metrics"])
+            amount = breakdown.get(p) if isinstance(breakdown, dict) else None
+            if isinstance(amount, (int, float)):
+                # The caller's allocation is the spend the curve is calibrated at; conversions scale with it
+                # so allocate() keeps the aggregate's conversions per unit of revenue
+                cost = channel["spend"]
+                channel["conversions"] = channel["conversions"] * float(amount) / cost if cost > 0 else 0.0
+                channel["spend"] = float(amount)
+            channels.append(channel)
+        return channels
+
+    @staticmethod
+    def _channel(platform: str, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "platform": platform,
+            "spend": float(metrics.get("cost", 0) or 0),
+            "roi": float(metrics.get("roi", 0) or 0),
+            "conversions": float(metrics.get("conversions", 0) or 0),
+            "cpc": float(metrics.get("cpc", 0) or 0)
         }
@@ -1,4 +1,5 @@
 from .base import BaseAgent
+from . import analysis as analysis_engine
 from typing import Dict, Any, List
 import json
 
@@ -117,97 +118,13 @@ class InsightsAgent(BaseAgent):
         """Analyze cost efficiency across platforms"""
         if not platforms_data:
             return {"error": "No data available"}
-        
-        total_spend = 0
-        total_conversions = 0
-        platform_efficiency = []
-        
-        for platform in platforms_data:
-            metrics = platform.get("metrics", {})
-            platform_name = platform.get("platform", "Unknown")
-            
-            cost = metrics.get("cost", 0)
-            conversions = metrics.get("conversions", 0)
-            cpc = metrics.get("cpc", 0)
-            roi = metrics.get("roi", 0)
-            ctr = metrics.get("ctr", 0)
-            
-            total_spend += cost
-            total_conversions += conversions
-            
-            # Calculate efficiency metrics
-            cost_per_conversion = cost / conversions if conversions > 0 else float('inf')
-            efficiency_score = (roi * ctr) / cpc if cpc > 0 else 0
-            
-            platform_efficiency.append({
-                "platform": platform_name,
-                "cost": cost,
-                "conversions": conversions,
-                "cost_per_conversion": cost_per_conversion,
-                "efficiency_score": efficiency_score,
-                "roi": roi,
-                "cpc": cpc,
-                "ctr": ctr,
-                "is_underperforming": roi < 1.5 or ctr < 1.0
-            })
-        
-        # Sort by efficiency
-        platform_efficiency.sort(key=lambda x: x["efficiency_score"], reverse=True)
-        
-        return {
-            "total_spend": total_spend,
-            "total_conversions": total_conversions,
-            "avg_cost_per_conversion": total_spend / total_conversions if total_conversions > 0 else 0,
-            "platform_efficiency": platform_efficiency,
-            "underperforming_platforms": [p for p in platform_efficiency if p["is_underperforming"]],
-            "waste_estimate": sum(p["cost"] for p in platform_efficiency if p["is_underperforming"])
-        }
+        return analysis_engine.cost_efficiency(analysis_engine.build_frame(platforms_data))
 
     def _analyze_growth_opportunities(self, platforms_data: List[Dict]) -> Dict[str, Any]:
         """Analyze growth and scaling opportunities"""
         if not platforms_data:
             return {"error": "No data available"}
-        
-        total_revenue = 0
-        platform_opportunities = []
-        
-        for platform in platforms_data:
-            metrics = platform.get("metrics", {})
-            platform_name = platform.get("platform", "Unknown")
-            
-            cost = metrics.get("cost", 0)
-            roi = metrics.get("roi", 0)
-            ctr = metrics.get("ctr", 0)
-            conversions = metrics.get("conversions", 0)
-            
-            revenue = cost * roi
-            total_revenue += revenue
-            
-            # Calculate growth potential
-            growth_score = roi * ctr * (conversions / 100)  # Weighted growth score
-            scaling_potential = "High" if roi > 2.0 and ctr > 2.0 else "Medium" if roi > 1.5 else "Low"
-            
-            platform_opportunities.append({
-                "platform": platform_name,
-                "current_revenue": revenue,
-                "roi": roi,
-                "ctr": ctr,
-                "conversions": conversions,
-                "growth_score": growth_score,
-                "scaling_potential": scaling_potential,
-                "is_high_performer": roi > 2.0 and ctr > 1.5
-            })
-        
-        # Sort by growth potential
-        platform_opportunities.sort(key=lambda x: x["growth_score"], reverse=True)
-        
-        return {
-            "total_revenue": total_revenue,
-            "platform_opportunities": platform_opportunities,
-            "high_performers": [p for p in platform_opportunities if p["is_high_performer"]],
-            "scaling_candidates": [p for p in platform_opportunities if p["scaling_potential"] == "High"],
-            "revenue_opportunity": sum(p["current_revenue"] * 0.4 for p in platform_opportunities if p["is_high_performer"])
-        }
+        return analysis_engine.growth_opportunities(analysis_engine.build_frame(platforms_data))
 
     def _fallback_cost_insights(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback cost reduction insights when API fails"""
@@ -5,12 +5,49 @@ from .roi_analyst import ROIAgent
 from .timeline import TimelineAgent
 from .consistency import ConsistencyAgent
 from .broadcast import ExecutionAgent
-from typing import Dict, Any, List
+from .scheduler import AgentDAG, AgentNode
+from .base import FALLBACK_RESPONSE
+from typing import Dict, Any, List, Tuple
 import uuid
 import os
+import copy
 import json
 from datetime import datetime
 
+# Deterministic campaign lifecycle: action -> (statuses it may be applied from, resulting status).
+# Mirrors the transitions spelled out in the execute_action prompt; the LLM only writes the confirmation.
+_STARTABLE = frozenset({"Draft", "Paused", "Suspended"})
+LIFECYCLE_TRANSITIONS = {
+    "Launch": (_STARTABLE, "Active"),
+    "Activate": (_STARTABLE, "Active"),
+    "Resume": (_STARTABLE, "Active"),
+    "Pause": (frozenset({"Active"}), "Paused"),
+    "Halt": (frozenset({"Active"}), "Paused"),
+    "Terminate": (frozenset({"Draft", "Active", "Paused", "Suspended"}), "Terminated"),
+}
+# Target statuses accepted in place of an action (the status endpoint takes either)
+STATUS_ACTIONS = {"Active": "Activate", "Paused": "Pause", "Terminated": "Terminate"}
+
+
+class InvalidTransition(ValueError):
+    """Raised for an action that is unknown or not allowed from the campaign's current status."""
+    def __init__(self, message: str, unknown_action: bool = False):
+        super().__init__(message)
+        self.unknown_action = unknown_action
+
+
+def resolve_transition(current_status: str, action: str) -> Tuple[str, str]:
+    """Returns (canonical action, new status); the new status equals the current one for a no-op."""
+    action = STATUS_ACTIONS.get(action, action)
+    if action not in LIFECYCLE_TRANSITIONS:
+        raise InvalidTransition(f"Unknown action '{action}'. Valid: {', '.join(LIFECYCLE_TRANSITIONS)}", unknown_action=True)
+    sources, target = LIFECYCLE_TRANSITIONS[action]
+    if current_status == target:
+        return action, target
+    if current_status not in sources:
+        raise InvalidTransition(f"Cannot {action.lower()} a campaign that is {current_status}")
+    return action, target
+
 
 class CampaignOrchestratorAgent(BaseAgent):
     """
@@ -26,6 +63,55 @@ class CampaignOrchestratorAgent(BaseAgent):
         self.timeline_manager = TimelineAgent()
         self.consistency_auditor = ConsistencyAgent()
         self.execution_lead = ExecutionAgent()
+        self.pipeline = self._build_pipeline()
+
+    def _build_pipeline(self) -> AgentDAG:
+        """
+        Campaign build graph. Each node declares the upstream outputs it consumes;
+        independent agents run in parallel and ROI/timeline wait only on what they need.
+        """
+        def fallback(_inputs):
+            return copy.deepcopy(FALLBACK_RESPONSE)
+
+        def broadcast_fallback(inputs):
+            platforms = inputs["request"].get("platforms", [])
+            return {
+                "broadcast_status": "Pending",
+                "deployments": {p: "Queued" for p in platforms},
+                "confirmation_code": None,
+                "ai_signal": "Broadcast confirmation delayed; deployment queued."
+            }
+
+        return AgentDAG([
+            AgentNode("strategy", lambda d: self.planner.run({
+                "objective": d["request"]["objective"], "budget": d["request"]["budget"]
+            }), inputs=["request"], fallback=fallback),
+            AgentNode("recommendation", lambda d: self.recommender.run({
+                "objective": d["request"]["objective"]
+            }), inputs=["request"], fallback=fallback),
+            AgentNode("roi_forecast", lambda d: self.roi_analyst.run({
+                "budget": d["request"]["budget"],
+                "platform_split": (d["recommendation"] or {}).get("platform_split"),
+                "platforms": d["request"]["platforms"]
+            }), inputs=["request", "recommendation"], fallback=fallback),
+            AgentNode("timeline", lambda d: self.timeline_manager.run({
+                "milestones": (d["strategy"] or {}).get("milestones")
+            }), inputs=["strategy"], fallback=fallback),
+            AgentNode("broadcast_log", lambda d: self.execution_lead.run({
+                "platforms": d["request"]["platforms"]
+            }), inputs=["request"], fallback=broadcast_fallback),
+        ])
+
+    def plan_campaign(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs the agent pipeline for a campaign request without registering it on any platform."""
+        # Plan, recommend, forecast, schedule and broadcast via the dependency graph
+        run = self.pipeline.run({"request": {
+            "objective": data.get("objective"), "budget": float(data.get("budget", 0)),
+            "platforms": list(data.get("platforms", []))
+        }})
+        self.log_activity(f"Agent pipeline finished in {run['wall_ms']}ms: " + ", ".join(
+            f"{t['node']}={t['duration_ms']}ms/{t['status']}" for t in run["trace"]))
+        return run
 
     def initialize_campaign(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Orchestrates multiple agents to build a complete campaign."""
@@ -36,20 +122,8 @@ class CampaignOrchestratorAgent(BaseAgent):
         budget = float(data.get("budget", 0))
         platforms = data.get("platforms", [])
 
-        # 1. Plan
-        plan = self.planner.run({"objective": objective, "budget": budget})
-        
-        # 2. Recommend
-        recommendation = self.recommender.run({"objective": objective})
-        
-        # 3. Forecast ROI
-        roi_forecast = self.roi_analyst.run({"budget": budget})
-        
-        # 4. Schedule
-        schedule = self.timeline_manager.run({})
-        
-        # 5. Execute initial broadcast
-        broadcast = self.execution_lead.run({"platforms": platforms})
+        run = self.plan_campaign(data)
+        results = run["outputs"]
 
         campaign_id = str(uuid.uuid4())
 
@@ -77,12 +151,13 @@ class CampaignOrchestratorAgent(BaseAgent):
             "spent": 0,
             "objective": objective,
             "platforms": platforms,
-            "strategy": plan,
-            "recommendation": recommendation,
-            "roi_forecast": roi_forecast,
-            "timeline": schedule,
-            "broadcast_log": broadcast,
-            "created_at": datetime.now().isoformat()
+            "strategy": results["strategy"],
+            "recommendation": results["recommendation"],
+            "roi_forecast": results["roi_forecast"],
+            "timeline": results["timeline"],
+            "broadcast_log": results["broadcast_log"],
+            "created_at": datetime.now().isoformat(),
+            "agent_trace": run["trace"]
         }
 
     def execute_action(self, campaign: Dict[str, Any], action: str) -> Dict[str, Any]:
@@ -121,6 +196,32 @@ class CampaignOrchestratorAgent(BaseAgent):
         result = self.call_llm(prompt, schema)
         return result
 
+    def confirm_transition(self, action: str, from_status: str, to_status: str) -> Dict[str, Any]:
+        """
+        Uses LLM to write one confirmation for a lifecycle transition that the service has already applied.
+        The message names no campaign, so it can be attached to every campaign making the same transition.
+        """
+        self.log_activity(f"Confirming transition '{action}': {from_status} -> {to_status}...")
+
+        prompt = f"""
+        Act as a Campaign Lifecycle Manager. A user-requested action has already moved one or more campaigns
+        to a new status. Write a brief AI signal (confirmation message) for the state transition log.
+
+        Requested Action: {action}
+        Previous Status: {from_status}
+        New Status: {to_status}
+
+        Do not name a specific campaign; the confirmation applies to every campaign making this transition.
+        """
+
+        schema = """
+        {
+            "ai_confirmation": "A professional 1-sentence confirmation of the state transition log."
+        }
+        """
+
+        return self.call_llm(prompt, schema)
+
     def run(self, input_data: Any) -> Dict[str, Any]:
         # Generic run implementation for BaseAgent compatibility
         return {"message": "Orchestrator active. Use specific methods for complex tasks."}
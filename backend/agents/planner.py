@@ -3,6 +3,8 @@ from typing import Dict, Any
 
 class PlannerAgent(BaseAgent):
     """Defines campaign objectives, target audience, and high-level strategy using Gemini AI."""
+    priority = "background"
+
     def __init__(self):
         super().__init__(name="Aurelius", role="Campaign Planner")
 
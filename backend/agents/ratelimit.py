@@ -0,0 +1,181 @@
+"""
+Process-wide admission control for LLM calls.
+Two token buckets (requests/min and tokens/min) sit in front of the shared OpenAI client.
+Callers queue by priority class and are rejected immediately when the projected
+wait would exceed their class deadline, so agents fall back instead of piling up 429s.
+"""
+
+from typing import Dict, Optional
+from contextlib import contextmanager
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from telemetry import registry
+
+# Lower rank is served first
+PRIORITIES = {"interactive": 0, "background": 1, "batch": 2}
+DEFAULT_PRIORITY = "interactive"
+
+# Longest time a call of each class may wait for capacity before falling back
+PRIORITY_DEADLINES = {
+    "interactive": float(os.getenv("LLM_DEADLINE_INTERACTIVE", "2")),
+    "background": float(os.getenv("LLM_DEADLINE_BACKGROUND", "15")),
+    "batch": float(os.getenv("LLM_DEADLINE_BATCH", "120")),
+}
+
+QUEUE_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 15.0, 60.0, 120.0)
+
+LLM_QUEUE_DEPTH = registry.gauge(
+    "agent_llm_queue_depth", "LLM calls waiting for rate-limit capacity.", ["priority"])
+LLM_QUEUE_WAIT = registry.histogram(
+    "agent_llm_queue_wait_seconds", "Time LLM calls spent waiting for rate-limit capacity.",
+    ["priority", "outcome"], buckets=QUEUE_WAIT_BUCKETS)
+LLM_TOKEN_CORRECTIONS = registry.counter(
+    "agent_llm_rate_limit_token_corrections_total",
+    "Tokens refunded or additionally charged when reported usage differs from the admission estimate.",
+    ["direction"])
+
+_priority = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Runs the enclosed block (and work copied from its context) at the given priority class."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority '{priority}'")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: Optional[str] = None) -> str:
+    return _priority.get() or default or DEFAULT_PRIORITY
+
+
+class RateLimited(Exception):
+    """Raised when a call cannot be admitted within its priority deadline."""
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute / 60` per second. A limit of 0 disables it."""
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def refill(self, now: float):
+        if self.enabled:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.level -= amount
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` is available, assuming nothing else is taken meanwhile."""
+        if not self.enabled:
+            return 0.0
+        # Requests larger than the bucket are admitted once it is full
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+
+class LLMRateLimiter:
+    def __init__(self, rpm: float = None, tpm: float = None):
+        self.requests = _Bucket(rpm if rpm is not None else float(os.getenv("LLM_RPM_LIMIT", "500")))
+        self.tokens = _Bucket(tpm if tpm is not None else float(os.getenv("LLM_TPM_LIMIT", "200000")))
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (rank, seq, estimate)
+        self._seq = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests.enabled or self.tokens.enabled
+
+    def acquire(self, estimated_tokens: int, priority: str = DEFAULT_PRIORITY) -> int:
+        """
+        Blocks until one request and `estimated_tokens` tokens are available, serving
+        higher priority classes first. Raises RateLimited as soon as the projected wait
+        exceeds the class deadline. Returns the token charge to pass to settle().
+        """
+        if not self.enabled:
+            return 0
+        deadline_s = PRIORITY_DEADLINES.get(priority, PRIORITY_DEADLINES[DEFAULT_PRIORITY])
+        started = time.monotonic()
+        deadline = started + deadline_s
+        entry = (PRIORITIES.get(priority, 0), next(self._seq), estimated_tokens)
+        depth = LLM_QUEUE_DEPTH.labels(priority)
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            depth.inc()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    wait = self._projected_wait(entry)
+                    if wait <= 0 and self._waiters[0] is entry:
+                        self.requests.take(1)
+                        self.tokens.take(estimated_tokens)
+                        LLM_QUEUE_WAIT.labels(priority, "admitted").observe(now - started)
+                        return estimated_tokens
+                    if now + wait > deadline:
+                        LLM_QUEUE_WAIT.labels(priority, "rejected").observe(now - started)
+                        raise RateLimited(
+                            f"{priority} LLM call would wait {wait:.2f}s for capacity (deadline {deadline_s}s)")
+                    # Woken early whenever a waiter leaves or capacity is refunded
+                    self._cond.wait(min(max(wait, 0.001), deadline - now))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                depth.dec()
+                self._cond.notify_all()
+
+    def _projected_wait(self, entry) -> float:
+        """Time until `entry` could be admitted once every higher-ranked waiter ahead of it is served."""
+        ahead = [w for w in self._waiters if w <= entry]
+        return max(self.requests.time_until(len(ahead)), self.tokens.time_until(sum(w[2] for w in ahead)))
+
+    def settle(self, charged: int, actual_tokens: Optional[int]):
+        """Reconciles the up-front estimate with the usage the API reported for the call."""
+        if not self.tokens.enabled or not charged or actual_tokens is None:
+            return
+        delta = actual_tokens - charged
+        if delta == 0:
+            return
+        LLM_TOKEN_CORRECTIONS.labels("charge" if delta > 0 else "refund").inc(abs(delta))
+        with self._cond:
+            self.tokens.refill(time.monotonic())
+            # May go negative: over-spend is repaid by later callers waiting longer
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level - delta)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                "requests_available": round(self.requests.level, 2),
+                "tokens_available": round(self.tokens.level, 2),
+                "queued": len(self._waiters)
+            }
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Rough prompt size (~4 characters per token) plus the completion budget."""
+    return len(prompt) // 4 + max_tokens
+
+llm_limiter = LLMRateLimiter()
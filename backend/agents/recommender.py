@@ -4,6 +4,8 @@ import random
 
 class ChannelRecommenderAgent(BaseAgent):
     """Recommends the best platforms and budget splits using Gemini AI."""
+    priority = "background"
+
     def __init__(self):
         super().__init__(name="Navigator", role="Channel Specialist")
 
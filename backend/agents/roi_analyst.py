@@ -1,29 +1,90 @@
 from .base import BaseAgent
-from typing import Dict, Any
-import random
+from .forecasting import DEFAULT_TRIALS, FORECAST_WORKERS, estimate_distributions, forecast, forecast_batch
+from typing import Dict, Any, List, Optional
+import threading
+
+FORECAST_PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+
 
 class ROIAgent(BaseAgent):
-    """Performs deep financial forecasting and ROI projections using Gemini AI."""
+    """
+    Performs financial forecasting and ROI projections.
+    Forecasts are Monte Carlo simulations over each platform's observed CTR/CVR/CPC (see forecasting.py).
+    """
+    priority = "background"
+
     def __init__(self):
         super().__init__(name="ProfitMax", role="ROI Analyst")
+        from events import bus
+        # Per-platform rate distributions; a platform_data event drops only that platform's entry and
+        # bumps its generation, so a build that overlapped the write is not cached
+        self._distributions: Dict[str, Dict[str, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        bus.subscribe("platform_data", self._on_platform_data)
 
     def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        budget = input_data.get("budget", 1000)
-        self.log_activity(f"Forecasting yield for budget {budget} using Gemini...")
-        
-        prompt = f"""
-        Perform a financial forecast for a marketing campaign with a budget of ₹{budget}.
-        Calculate potential ROI and conversion estimates based on current mid-market digital marketing benchmarks.
-        """
-        
-        schema = """
-        {
-            "projected_roi": float (e.g., 3.4),
-            "projected_revenue": float,
-            "projected_conversions": int,
-            "confidence_score": "Percentage string (e.g. '85%')"
-        }
-        """
-        
-        result = self.call_llm(prompt, schema)
+        budget = float(input_data.get("budget", 1000) or 0)
+        split = self._split(input_data.get("platform_split"), input_data.get("platforms"))
+        trials = int(input_data.get("trials") or DEFAULT_TRIALS)
+        self.log_activity(f"Simulating {trials:,} outcomes for budget {budget} across {', '.join(split)}...")
+
+        result = forecast(budget, split, self.distributions(split), trials=trials)
+        result["platform_split"] = split
         return result
+
+    def forecast_campaigns(self, campaign_ids: Optional[List[str]] = None, trials: int = DEFAULT_TRIALS,
+                           workers: int = FORECAST_WORKERS) -> List[Dict[str, Any]]:
+        """Forecasts every campaign's budget over its planned split (no LLM calls), on a process pool for large batches."""
+        from database import db
+
+        campaigns = db.get_campaigns_by_ids(campaign_ids) if campaign_ids else db.get_campaigns()
+        jobs = []
+        for c in campaigns:
+            split = self._split((c.get("recommendation") or {}).get("platform_split"), c.get("platforms"))
+            jobs.append((c["id"], float(c.get("budget") or 0), split))
+        platforms = {p for _, _, split in jobs for p in split}
+        results = forecast_batch(jobs, self.distributions(platforms), trials=trials, workers=workers)
+        return [{"campaign_id": c["id"], "name": c["name"], "budget": budget, "platform_split": split, **result}
+                for c, (_, budget, split), result in zip(campaigns, jobs, results)]
+
+    def distributions(self, platforms) -> Dict[str, Dict[str, Any]]:
+        from platforms import PlatformAPI
+
+        result = {}
+        for p in platforms:
+            with self._lock:
+                if p in self._distributions:
+                    result[p] = self._distributions[p]
+                    continue
+                generation = self._generations.get(p, 0)
+            result[p] = estimate_distributions(c["metrics"] for c in PlatformAPI.get_all_campaigns_in_platform(p))
+            with self._lock:
+                if self._generations.get(p, 0) == generation:
+                    self._distributions[p] = result[p]
+        return result
+
+    def _on_platform_data(self, topic: str, platform: str, **_):
+        with self._lock:
+            self._generations[platform] = self._generations.get(platform, 0) + 1
+            self._distributions.pop(platform, None)
+
+    @staticmethod
+    def _split(platform_split: Optional[Dict[str, Any]], platforms: Optional[List[str]] = None) -> Dict[str, float]:
+        """Recommender split (fractions of the budget per platform), else an even split over the campaign's platforms."""
+        split = {}
+        if isinstance(platform_split, dict):
+            for p, share in platform_split.items():
+                try:
+                    if float(share) > 0:
+                        split[p] = float(share)
+                except (TypeError, ValueError):
+                    continue
+        if platforms and split:
+            # Only the platforms the campaign actually runs on receive budget
+            split = {p: s for p, s in split.items() if p in platforms}
+        if not split:
+            targets = platforms or FORECAST_PLATFORMS
+            split = {p: 1.0 / len(targets) for p in targets}
+        total = sum(split.values())
+        return {p: round(s / total, 4) for p, s in split.items()}
@@ -0,0 +1,126 @@
+from typing import Dict, Any, List, Callable, Optional, Iterable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import contextvars
+import os
+import time
+
+DEFAULT_NODE_TIMEOUT = float(os.getenv("AGENT_NODE_TIMEOUT", "45"))
+
+
+class AgentNode:
+    """
+    A unit of work in an AgentDAG.
+    `run` receives a dict holding the outputs of every node named in `inputs`
+    (plus any seed values passed to AgentDAG.run) and returns this node's output.
+    """
+    def __init__(self, key: str, run: Callable[[Dict[str, Any]], Any], inputs: Iterable[str] = (),
+                 timeout: Optional[float] = None, fallback: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.key = key
+        self.run = run
+        self.inputs = list(inputs)
+        self.timeout = timeout if timeout is not None else DEFAULT_NODE_TIMEOUT
+        self.fallback = fallback
+
+
+class AgentDAG:
+    """
+    Dependency-aware scheduler for agent pipelines.
+    Nodes whose inputs are satisfied run concurrently, so total wall-clock time
+    tracks the critical path rather than the sum of all agent calls.
+    """
+    def __init__(self, nodes: List[AgentNode], max_workers: Optional[int] = None):
+        self.nodes = {n.key: n for n in nodes}
+        if len(self.nodes) != len(nodes):
+            raise ValueError("Duplicate node keys in AgentDAG")
+        self.max_workers = max_workers or len(nodes)
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(key: str, path: List[str]):
+            if key in done or key not in self.nodes:
+                return
+            if key in visiting:
+                raise ValueError(f"Cycle detected in AgentDAG: {' -> '.join(path + [key])}")
+            visiting.add(key)
+            for dep in self.nodes[key].inputs:
+                visit(dep, path + [key])
+            visiting.discard(key)
+            done.add(key)
+
+        for key in self.nodes:
+            visit(key, [])
+
+    def run(self, seed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Executes the graph and returns {"outputs": {...}, "trace": [...], "wall_ms": float}.
+        A node that raises or exceeds its timeout yields its fallback output (or None)
+        and downstream nodes still run.
+        """
+        outputs: Dict[str, Any] = dict(seed or {})
+        missing = {dep for n in self.nodes.values() for dep in n.inputs if dep not in self.nodes and dep not in outputs}
+        if missing:
+            raise ValueError(f"AgentDAG inputs not provided: {', '.join(sorted(missing))}")
+
+        pending = dict(self.nodes)
+        running = {}  # future -> (node, started_at)
+        trace = []
+        origin = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent-dag")
+
+        def record(node: AgentNode, started: float, status: str, value: Any, error: Optional[str] = None):
+            if status != "ok":
+                value = node.fallback(self._inputs_for(node, outputs)) if node.fallback else None
+            outputs[node.key] = value
+            finished = time.perf_counter()
+            trace.append({
+                "node": node.key,
+                "status": status,
+                "inputs": node.inputs,
+                "start_ms": round((started - origin) * 1000, 1),
+                "end_ms": round((finished - origin) * 1000, 1),
+                "duration_ms": round((finished - started) * 1000, 1),
+                "error": error
+            })
+
+        try:
+            while pending or running:
+                for key, node in list(pending.items()):
+                    if all(dep in outputs for dep in node.inputs):
+                        # Copy the caller's context so context-scoped settings follow the work onto the pool
+                        ctx = contextvars.copy_context()
+                        future = executor.submit(ctx.run, node.run, self._inputs_for(node, outputs))
+                        running[future] = (node, time.perf_counter())
+                        del pending[key]
+
+                now = time.perf_counter()
+                next_deadline = min(started + node.timeout for node, started in running.values())
+                done, _ = wait(list(running), timeout=max(0.0, next_deadline - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    node, started = running.pop(future)
+                    try:
+                        record(node, started, "ok", future.result())
+                    except Exception as e:
+                        print(f"[AgentDAG] Node '{node.key}' failed: {e}")
+                        record(node, started, "error", None, f"{type(e).__name__}: {e}")
+
+                now = time.perf_counter()
+                for future, (node, started) in list(running.items()):
+                    if now - started >= node.timeout:
+                        # The worker thread cannot be killed; its late result is simply discarded
+                        running.pop(future)
+                        print(f"[AgentDAG] Node '{node.key}' timed out after {node.timeout}s")
+                        record(node, started, "timeout", None, f"Timed out after {node.timeout}s")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {
+            "outputs": {key: outputs[key] for key in self.nodes},
+            "trace": trace,
+            "wall_ms": round((time.perf_counter() - origin) * 1000, 1)
+        }
+
+    def _inputs_for(self, node: AgentNode, outputs: Dict[str, Any]) -> Dict[str, Any]:
+        return {dep: outputs.get(dep) for dep in node.inputs}
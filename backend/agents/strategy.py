@@ -1,4 +1,5 @@
 from .base import BaseAgent
+from . import analysis as analysis_engine
 from typing import Dict, Any, List
 import json
 
@@ -73,70 +74,7 @@ class StrategyAgent(BaseAgent):
         """Analyze platform data to extract key insights"""
         if not platforms_data:
             return {"error": "No data available"}
-        
-        analysis = {
-            "total_platforms": len(platforms_data),
-            "platform_performance": [],
-            "cost_insights": {},
-            "optimization_opportunities": {}
-        }
-        
-        total_spend = 0
-        total_revenue = 0
-        best_roi_platform = None
-        worst_cpc_platform = None
-        highest_ctr_platform = None
-        
-        for platform in platforms_data:
-            metrics = platform.get("metrics", {})
-            platform_name = platform.get("platform", "Unknown")
-            
-            cost = metrics.get("cost", 0)
-            roi = metrics.get("roi", 0)
-            cpc = metrics.get("cpc", 0)
-            ctr = metrics.get("ctr", 0)
-            conversions = metrics.get("conversions", 0)
-            
-            total_spend += cost
-            total_revenue += cost * roi
-            
-            platform_perf = {
-                "platform": platform_name,
-                "cost": cost,
-                "roi": roi,
-                "cpc": cpc,
-                "ctr": ctr,
-                "conversions": conversions,
-                "revenue": cost * roi
-            }
-            analysis["platform_performance"].append(platform_perf)
-            
-            # Track best/worst performers
-            if not best_roi_platform or roi > best_roi_platform["roi"]:
-                best_roi_platform = platform_perf
-            
-            if not worst_cpc_platform or (cpc > 0 and cpc > worst_cpc_platform["cpc"]):
-                worst_cpc_platform = platform_perf
-                
-            if not highest_ctr_platform or ctr > highest_ctr_platform["ctr"]:
-                highest_ctr_platform = platform_perf
-        
-        # Cost reduction insights
-        analysis["cost_insights"] = {
-            "total_spend": total_spend,
-            "avg_roi": total_revenue / total_spend if total_spend > 0 else 0,
-            "worst_cpc_platform": worst_cpc_platform["platform"] if worst_cpc_platform else "N/A",
-            "underperforming_platforms": [p for p in analysis["platform_performance"] if p["roi"] < 1.5]
-        }
-        
-        # Optimization opportunities
-        analysis["optimization_opportunities"] = {
-            "best_roi_platform": best_roi_platform["platform"] if best_roi_platform else "N/A",
-            "highest_ctr_platform": highest_ctr_platform["platform"] if highest_ctr_platform else "N/A",
-            "high_performers": [p for p in analysis["platform_performance"] if p["roi"] > 2.0]
-        }
-        
-        return analysis
+        return analysis_engine.performance_summary(analysis_engine.build_frame(platforms_data))
     
     def _generate_fallback_insights(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate data-driven fallback insights when API fails"""
@@ -4,15 +4,24 @@ from datetime import datetime, timedelta
 
 class TimelineAgent(BaseAgent):
     """Generates execution schedules and milestone deadlines using Gemini AI."""
+    priority = "background"
+
     def __init__(self):
         super().__init__(name="Chronos", role="Timeline Manager")
 
     def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        milestones = input_data.get("milestones") or []
         self.log_activity("Mapping campaign milestones using Gemini AI...")
         
-        prompt = """
+        # Schedule the planner's milestones when available instead of inventing new ones
+        milestone_hint = ""
+        if milestones:
+            milestone_hint = "Use these planned milestones, in order: " + "; ".join(str(m) for m in milestones)
+        
+        prompt = f"""
         Generate a realistic 30-day marketing campaign execution timeline. 
-        Include exactly 4 milestones with dates starting from today.
+        Include exactly {len(milestones) or 4} milestones with dates starting from today ({datetime.now().date().isoformat()}).
+        {milestone_hint}
         """
         
         schema = """
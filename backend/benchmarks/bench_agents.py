@@ -0,0 +1,113 @@
+"""
+Agent Pipeline Benchmark
+Measures per-agent and end-to-end latency/throughput of the LLM agents.
+Run against the local stub so results are offline and reproducible:
+
+    python llm_stub_server.py --port 8100 --latency lognormal:600:0.3 &
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python benchmarks/bench_agents.py --requests 50 --concurrency 8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import (  # noqa: E402
+    PlannerAgent,
+    ChannelRecommenderAgent,
+    ROIAgent,
+    TimelineAgent,
+    ConsistencyAgent,
+    ExecutionAgent,
+    InsightsAgent
+)
+
+SAMPLE_PLATFORM_DATA = [
+    {"platform": "Instagram", "metrics": {"cost": 5000, "roi": 2.5, "cpc": 2.5, "ctr": 3.2, "conversions": 125,
+                                          "sentiment_score": 0.8}, "audience_insight": {"engagement_depth": "High"}},
+    {"platform": "Facebook", "metrics": {"cost": 3200, "roi": 1.2, "cpc": 3.1, "ctr": 0.9, "conversions": 40,
+                                         "sentiment_score": 0.6}, "audience_insight": {"engagement_depth": "Medium"}},
+]
+
+
+def campaign_pipeline(agents, i: int):
+    """Same agent sequence as CampaignOrchestratorAgent.initialize_campaign, minus platform registration."""
+    budget = 5000 + i
+    agents["planner"].run({"objective": "Sales", "budget": budget})
+    agents["recommender"].run({"objective": "Sales"})
+    agents["roi"].run({"budget": budget})
+    agents["timeline"].run({})
+    agents["broadcast"].run({"platforms": ["Instagram", "Facebook"]})
+
+
+def metrics_audit(agents, i: int):
+    agents["consistency"].run(SAMPLE_PLATFORM_DATA)
+
+
+def detailed_insights(agents, i: int):
+    agents["insights"].generate_cost_reduction_insights(SAMPLE_PLATFORM_DATA)
+    agents["insights"].generate_optimization_insights(SAMPLE_PLATFORM_DATA)
+
+
+SCENARIOS = {
+    "create_campaign": campaign_pipeline,
+    "campaign_metrics": metrics_audit,
+    "detailed_insights": detailed_insights,
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_scenario(name, fn, agents, requests: int, concurrency: int):
+    def timed(i):
+        start = time.perf_counter()
+        fn(agents, i)
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    print(f"{name:<20} n={requests:<5} "
+          f"p50={percentile(latencies, 50) * 1000:8.1f}ms "
+          f"p95={percentile(latencies, 95) * 1000:8.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:8.1f}ms "
+          f"mean={statistics.mean(latencies) * 1000:8.1f}ms "
+          f"throughput={requests / wall:6.2f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append")
+    args = parser.parse_args()
+
+    if not os.getenv("OPENAI_BASE_URL"):
+        print("Warning: OPENAI_BASE_URL is not set; requests will go to the real OpenAI API.")
+
+    agents = {
+        "planner": PlannerAgent(),
+        "recommender": ChannelRecommenderAgent(),
+        "roi": ROIAgent(),
+        "timeline": TimelineAgent(),
+        "broadcast": ExecutionAgent(),
+        "consistency": ConsistencyAgent(),
+        "insights": InsightsAgent(),
+    }
+
+    for name in args.scenario or sorted(SCENARIOS):
+        run_scenario(name, SCENARIOS[name], agents, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
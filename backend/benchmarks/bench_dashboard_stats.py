@@ -0,0 +1,118 @@
+"""
+Dashboard Stats Benchmark
+Compares the legacy three-pass global aggregation of DashboardService.get_stats
+(aggregate stats, then campaign scan, then aggregate stats again for CTR/CPC)
+with the single-pass DashboardService.aggregate_platform_files.
+
+Runs against a synthetic copy of the platform files so results do not depend on
+local data and nothing under backend/data is touched:
+
+    python benchmarks/bench_dashboard_stats.py --campaigns 2000 --iterations 20
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import platforms as platforms_module  # noqa: E402
+from platforms import PlatformAPI  # noqa: E402
+from services.dashboard_service import dashboard_service  # noqa: E402
+
+PLATFORMS = ["Email", "Facebook", "Google Ads", "Instagram", "Twitter"]
+
+
+def legacy_aggregate():
+    """The global branch of get_stats before the single-pass rewrite (data reads only)."""
+    for p_name in PLATFORMS:
+        PlatformAPI.get_platform_aggregate_stats(p_name)  # result was discarded ("RESET")
+
+    spend = revenue = 0
+    channels = {}
+    for p_name in PLATFORMS:
+        campaigns_in_file = PlatformAPI.get_all_campaigns_in_platform(p_name)
+        for c in campaigns_in_file:
+            m = c["metrics"]
+            spend += m.get("cost", 0)
+            revenue += m.get("cost", 0) * m.get("roi", 0)
+        if campaigns_in_file:
+            channels[p_name] = True
+
+    for name in channels:
+        aggregate = PlatformAPI.get_platform_aggregate_stats(name)
+        aggregate["metrics"].get("ctr", 0)
+        aggregate["metrics"].get("cpc", 0)
+    return spend, revenue
+
+
+def write_synthetic_data(directory: str, campaigns: int, seed: int = 7):
+    rng = random.Random(seed)
+    for platform in PLATFORMS:
+        data = {"platform": platform, "campaigns": {}}
+        for i in range(campaigns):
+            impressions = rng.randint(1000, 20000)
+            clicks = rng.randint(50, 1500)
+            cost = round(rng.uniform(100, 1000), 2)
+            data["campaigns"][f"camp-{i}"] = {
+                "name": f"Campaign {i}",
+                "metrics": {
+                    "impressions": impressions, "clicks": clicks, "cost": cost,
+                    "conversions": rng.randint(10, 150), "roi": round(rng.uniform(1.2, 4.0), 2),
+                    "ctr": round(clicks / impressions * 100, 2), "cpc": round(cost / clicks, 2),
+                    "cpm": round(rng.uniform(20, 80), 2), "conversion_rate": round(rng.uniform(5, 25), 2),
+                    "audience_insight": {"primary_segment": "Gamers", "engagement_depth": "High"}
+                }
+            }
+        with open(os.path.join(directory, f"{platform}.json"), "w") as f:
+            json.dump(data, f)
+
+
+def measure(name: str, fn, iterations: int):
+    reads = {"count": 0}
+    original = PlatformAPI._read_json
+
+    def counting_read(filename):
+        reads["count"] += 1
+        return original(filename)
+
+    PlatformAPI._read_json = staticmethod(counting_read)
+    try:
+        fn()  # warm the page cache
+        reads["count"] = 0
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        PlatformAPI._read_json = staticmethod(original)
+
+    print(f"{name:<12} file_reads/request={reads['count'] / iterations:5.1f} "
+          f"p50={statistics.median(samples) * 1000:8.2f}ms "
+          f"mean={statistics.mean(samples) * 1000:8.2f}ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark global dashboard aggregation")
+    parser.add_argument("--campaigns", type=int, default=1000, help="Campaigns per platform file")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_synthetic_data(directory, args.campaigns)
+        platforms_module.DATA_DIR = directory
+        print(f"{args.campaigns} campaigns x {len(PLATFORMS)} platform files")
+        legacy = measure("legacy", legacy_aggregate, args.iterations)
+        single = measure("single-pass", dashboard_service.aggregate_platform_files, args.iterations)
+        print(f"speedup: {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+ROI Forecast Benchmark
+Times the Monte Carlo forecast engine (agents/forecasting.py) on distributions estimated from the
+platform registries in backend/data (read only).
+
+    single:   one campaign, --trials trials over a 3-platform split
+    registry: forecast_data for many single-platform budgets at once, as a bulk import seeds them
+    batch:    --campaigns campaigns through forecast_batch, inline and on a process pool
+
+    python benchmarks/bench_forecast.py --trials 100000 --campaigns 200 --workers 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.forecasting import estimate_distributions, forecast, forecast_batch, forecast_platform_budgets  # noqa: E402
+from platforms import PlatformAPI  # noqa: E402
+
+PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+
+
+def timed(fn, repeat: int = 1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized Monte Carlo ROI forecasting")
+    parser.add_argument("--trials", type=int, default=100000)
+    parser.add_argument("--campaigns", type=int, default=200)
+    parser.add_argument("--budgets", type=int, default=10000, help="Budgets in the registry-seeding run")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    distributions = {p: estimate_distributions(c["metrics"] for c in PlatformAPI.get_all_campaigns_in_platform(p))
+                     for p in PLATFORMS}
+    split = {"Instagram": 0.4, "Facebook": 0.3, "Google Ads": 0.3}
+
+    elapsed, result = timed(lambda: forecast(50000, split, distributions, trials=args.trials), repeat=5)
+    print(f"\nsingle: {args.trials:,} trials x {len(split)} platforms in {elapsed * 1000:.1f}ms")
+    print(f"  roi p50 {result['projected_roi']}  bands {result['roi_bands']}  confidence {result['confidence_score']}")
+
+    rng = random.Random(42)
+    budgets = [rng.randint(500, 50000) for _ in range(args.budgets)]
+    elapsed, _ = timed(lambda: forecast_platform_budgets("Instagram", budgets, distributions["Instagram"], trials=250))
+    print(f"registry: {args.budgets:,} budgets x 250 trials in {elapsed:.2f}s")
+
+    jobs = [(f"bench-{i}", rng.randint(500, 50000), {p: rng.random() for p in rng.sample(PLATFORMS, rng.randint(1, 3))})
+            for i in range(args.campaigns)]
+    inline, inline_results = timed(lambda: forecast_batch(jobs, distributions, trials=args.trials, workers=1))
+    # The pool is long-lived; best of two leaves out the one-off forkserver start
+    pooled, pooled_results = timed(lambda: forecast_batch(jobs, distributions, trials=args.trials, workers=args.workers), repeat=2)
+    print(f"batch: {args.campaigns:,} campaigns x {args.trials:,} trials")
+    print(f"  inline {inline:.2f}s ({inline / args.campaigns * 1000:.1f}ms/campaign)")
+    print(f"  pool   {pooled:.2f}s with {args.workers} workers ({inline / pooled:.1f}x)  identical: {inline_results == pooled_results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Response Payload Benchmark
+Bytes on the wire and serialization time for `/api/campaigns`-shaped payloads
+(campaign rows carrying their LLM-generated strategy/recommendation/timeline/broadcast blobs).
+
+    before: FastAPI default path (jsonable_encoder + JSONResponse), uncompressed
+    after:  FastJSONResponse (orjson) returned directly, then gzip / brotli
+
+    python benchmarks/bench_payloads.py --campaigns 1000 10000
+"""
+
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from compression import FastJSONResponse, brotli, orjson  # noqa: E402
+
+PLATFORMS = ["Instagram", "Facebook", "Google Ads", "Email", "Twitter"]
+
+
+def make_campaigns(n: int):
+    campaigns = []
+    for i in range(n):
+        platforms = PLATFORMS[: 2 + i % 4]
+        campaigns.append({
+            "id": str(uuid.UUID(int=i)),
+            "name": f"Campaign {i}",
+            "status": ["Active", "Paused", "Draft"][i % 3],
+            "budget": 5000.0 + i,
+            "spent": round(1234.5 + i * 0.37, 2),
+            "objective": ["Sales", "Leads", "Traffic"][i % 3],
+            "platforms": platforms,
+            "strategy": {
+                "strategy": f"Full-funnel plan {i}: awareness via short-form video, retargeting of engaged viewers, "
+                            "and conversion-focused offers timed around peak purchase windows.",
+                "milestones": ["Initiation", "Market Penetration", "Scale", "Review"],
+                "priority": "High"
+            },
+            "recommendation": {
+                "platform_split": {p: round(1 / len(platforms), 3) for p in platforms},
+                "reasoning": "Historical data suggests high engagement on visual platforms for this objective; "
+                             "search captures high-intent demand."
+            },
+            "roi_forecast": {"projected_roi": 2.8, "projected_revenue": 140000.0 + i,
+                             "projected_conversions": 350 + i % 50, "confidence_score": "88%"},
+            "timeline": {
+                "execution_timeline": [{"milestone": f"Phase {k}: Step", "date": f"2025-01-{10 * k:02d}"} for k in range(1, 4)],
+                "duration_days": 30
+            },
+            "broadcast_log": {
+                "broadcast_status": "Live",
+                "deployments": {p: "Deployed" for p in platforms},
+                "confirmation_code": f"TX-{i:06d}",
+                "ai_signal": "All channels acknowledged the deployment; creatives are in review."
+            },
+            "created_at": f"2025-01-01T00:00:{i % 60:02d}.000000"
+        })
+    return campaigns
+
+
+def timed(fn, iterations: int):
+    samples = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples) * 1000
+
+
+def run(n: int, iterations: int):
+    campaigns = make_campaigns(n)
+
+    before, before_ms = timed(lambda: JSONResponse(jsonable_encoder(campaigns)).body, iterations)
+    after, after_ms = timed(lambda: FastJSONResponse(campaigns).body, iterations)
+    gz, gz_ms = timed(lambda: gzip.compress(after, 6), iterations)
+
+    print(f"\n{n} campaigns")
+    print(f"  before  default JSON      {len(before):>11,} B  serialize {before_ms:8.1f}ms")
+    print(f"  after   {'orjson' if orjson else 'json (orjson missing)':<17} {len(after):>11,} B  serialize {after_ms:8.1f}ms")
+    print(f"          + gzip            {len(gz):>11,} B  compress  {gz_ms:8.1f}ms")
+    if brotli is not None:
+        br, br_ms = timed(lambda: brotli.compress(after, quality=4), iterations)
+        print(f"          + brotli q4       {len(br):>11,} B  compress  {br_ms:8.1f}ms")
+    else:
+        print("          + brotli          (install `brotli` to enable)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+    for n in args.campaigns:
+        run(n, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
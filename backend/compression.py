@@ -0,0 +1,145 @@
+"""
+HTTP response compression and fast JSON rendering for large payloads.
+
+CompressionMiddleware negotiates Brotli (if the optional `brotli` package is installed)
+or gzip from Accept-Encoding and only compresses compressible bodies above a size threshold.
+FastJSONResponse renders with orjson when it is available and falls back to the stdlib encoder.
+"""
+
+from typing import Any
+import zlib
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: FastJSONResponse falls back to JSONResponse.render
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "application/javascript", "application/xml")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson. Return it directly from a route to also skip jsonable_encoder."""
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return super().render(content)
+
+
+def _accepted_encodings(header: str) -> dict:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: str):
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            # wbits=31 -> gzip container
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._br.process(data) if self._br else self._gz.compress(data)
+
+    def finish(self) -> bytes:
+        return self._br.finish() if self._br else self._gz.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with Brotli or gzip.
+    Single-chunk bodies below `minimum_size` are sent as-is; streamed bodies are compressed chunk by chunk.
+    """
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "compressor": None, "passthrough": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start = state["start"]
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if state["passthrough"]:
+                await send(message)
+                return
+
+            if state["compressor"] is None:
+                response_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in start["headers"]}
+                content_type = response_headers.get("content-type", "")
+                if ("content-encoding" in response_headers
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    state["passthrough"] = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                state["compressor"] = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                start["headers"] = [(k, v) for k, v in start["headers"] if k.lower() != b"content-length"]
+                start["headers"].append((b"content-encoding", encoding.encode("latin-1")))
+                vary = response_headers.get("vary")
+                start["headers"] = [(k, v) for k, v in start["headers"] if k.lower() != b"vary"]
+                start["headers"].append((b"vary", (f"{vary}, Accept-Encoding" if vary else "Accept-Encoding").encode("latin-1")))
+
+                if not more_body:
+                    compressed = state["compressor"].compress(body) + state["compressor"].finish()
+                    start["headers"].append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                await send(start)
+
+            chunk = state["compressor"].compress(body)
+            if not more_body:
+                chunk += state["compressor"].finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
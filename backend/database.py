@@ -1,15 +1,33 @@
 import sqlite3
 import json
 import os
-from typing import Dict, List, Any
-from datetime import datetime
+import threading
+from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from events import bus
 
-DB_FILE = os.path.join(os.path.dirname(__file__), "marketing.db")
+DB_FILE = os.getenv("MARKETING_DB_FILE", os.path.join(os.path.dirname(__file__), "marketing.db"))
+
+CAMPAIGN_COLUMNS = ["id", "name", "status", "budget", "spent", "objective", "platforms", "strategy",
+                    "recommendation", "roi_forecast", "timeline", "broadcast_log", "created_at"]
+JSON_COLUMNS = ["platforms", "strategy", "recommendation", "roi_forecast", "timeline", "broadcast_log"]
+# broadcast_log as a JSON object, tolerating NULL/invalid/non-object values in older rows
+BROADCAST_LOG_OBJECT = ("CASE WHEN json_valid(broadcast_log) THEN CASE WHEN json_type(broadcast_log) = 'object' "
+                        "THEN broadcast_log ELSE '{}' END ELSE '{}' END")
+# Sortable columns and the expression keyset pagination compares on
+CAMPAIGN_SORTS = {
+    "created_at": "created_at",
+    "name": "name",
+    "budget": "COALESCE(budget, 0)",
+    "spent": "COALESCE(spent, 0)",
+}
 
 class SQLiteDB:
     def __init__(self):
         self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
+        # Serializes every statement and commit on the shared connection across worker threads
+        self.lock = threading.RLock()
         self._create_tables()
         self._seed_if_empty()
 
@@ -35,6 +53,11 @@ class SQLiteDB:
             )
         """)
         
+        # Keyset pagination and filtered COUNTs on the campaign list
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns (created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_status_created ON campaigns (status, created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_objective_created ON campaigns (objective, created_at, id)")
+        
         # Metrics Table (Historical)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS metrics (
@@ -46,6 +69,8 @@ class SQLiteDB:
                 FOREIGN KEY (campaign_id) REFERENCES campaigns (id)
             )
         """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_series_ts ON metrics (campaign_id, platform, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_ts ON metrics (timestamp)")
         
         # AI Decisions Table
         cursor.execute("""
@@ -58,6 +83,49 @@ class SQLiteDB:
                 FOREIGN KEY (campaign_id) REFERENCES campaigns (id)
             )
         """)
+
+        # Background Jobs Table (durable queue for long-running agent work)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER DEFAULT 0,
+                max_attempts INTEGER DEFAULT 3,
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                run_after TEXT,
+                created_at TEXT,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after)")
+
+        # Agent Activity Log (persisted history of BaseAgent.log_activity)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS agent_activity (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                agent TEXT,
+                role TEXT,
+                message TEXT,
+                timestamp TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_activity_agent_ts ON agent_activity (agent, timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_activity_ts ON agent_activity (timestamp)")
+
+        # Consistency Audit Cache (one row per campaign, shared by all workers)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS audit_cache (
+                campaign_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                result TEXT,
+                created_at TEXT
+            )
+        """)
         
         self.conn.commit()
 
@@ -66,54 +134,190 @@ class SQLiteDB:
         pass
 
     def get_campaigns(self) -> List[Dict[str, Any]]:
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM campaigns ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT * FROM campaigns ORDER BY created_at DESC")
+            rows = cursor.fetchall()
+        return [self._decode_campaign(row) for row in rows]
+
+    def get_campaigns_by_ids(self, campaign_ids: List[str]) -> List[Dict[str, Any]]:
         campaigns = []
-        for row in rows:
-            c = dict(row)
-            # Json loads for complex fields
-            for field in ["platforms", "strategy", "recommendation", "roi_forecast", "timeline", "broadcast_log"]:
-                if c[field]:
-                    c[field] = json.loads(c[field])
-            campaigns.append(c)
+        ids = list(campaign_ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(f"SELECT * FROM campaigns WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                rows = cursor.fetchall()
+            campaigns.extend(self._decode_campaign(row) for row in rows)
         return campaigns
 
+    def _decode_campaign(self, row) -> Dict[str, Any]:
+        c = dict(row)
+        # Json loads for complex fields
+        for field in JSON_COLUMNS:
+            if c.get(field):
+                c[field] = json.loads(c[field])
+        return c
+
+    def _campaign_filters(self, status: str = None, objective: str = None, platform: str = None, search: str = None):
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if objective:
+            clauses.append("objective = ?")
+            params.append(objective)
+        if platform:
+            clauses.append("EXISTS (SELECT 1 FROM json_each(campaigns.platforms) WHERE json_each.value = ?)")
+            params.append(platform)
+        if search:
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        return clauses, params
+
+    def query_campaigns(self, status: str = None, objective: str = None, platform: str = None, search: str = None,
+                        sort: str = "created_at", descending: bool = True, limit: int = 50,
+                        after: Optional[tuple] = None, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        One page of campaigns, ordered by (sort, id). `after` is the (sort value, id) of the last
+        row of the previous page. Only `columns` are read and decoded (id is always included).
+        """
+        sort_expr = CAMPAIGN_SORTS[sort]
+        selected = [c for c in CAMPAIGN_COLUMNS if columns is None or c in columns or c == "id"]
+        clauses, params = self._campaign_filters(status, objective, platform, search)
+        if after is not None:
+            clauses.append(f"({sort_expr}, id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {', '.join(selected)}, {sort_expr} AS sort_key FROM campaigns"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {sort_expr} {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        return [self._decode_campaign(row) for row in rows]
+
+    def count_campaigns(self, status: str = None, objective: str = None, platform: str = None, search: str = None) -> int:
+        clauses, params = self._campaign_filters(status, objective, platform, search)
+        sql = "SELECT COUNT(*) FROM campaigns"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+
+    def get_existing_campaign_ids(self, campaign_ids: List[str]) -> set:
+        """Subset of `campaign_ids` that have a row, without decoding any campaign JSON."""
+        found = set()
+        ids = list(campaign_ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            with self.lock:
+                cursor = self.conn.cursor()
+                cursor.execute(f"SELECT id FROM campaigns WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                found.update(row["id"] for row in cursor.fetchall())
+        return found
+
     def add_campaign(self, c: Dict[str, Any]):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO campaigns (id, name, status, budget, spent, objective, platforms, strategy, recommendation, roi_forecast, timeline, broadcast_log, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            c["id"], c["name"], c["status"], c.get("budget", 0), c.get("spent", 0), 
-            c.get("objective"), json.dumps(c.get("platforms", [])), 
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO campaigns (id, name, status, budget, spent, objective, platforms, strategy, recommendation, roi_forecast, timeline, broadcast_log, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                c["id"], c["name"], c["status"], c.get("budget", 0), c.get("spent", 0), 
+                c.get("objective"), json.dumps(c.get("platforms", [])), 
+                json.dumps(c.get("strategy", {})), json.dumps(c.get("recommendation", {})),
+                json.dumps(c.get("roi_forecast", {})), json.dumps(c.get("timeline", {})),
+                json.dumps(c.get("broadcast_log", {})), c.get("created_at", datetime.now().isoformat())
+            ))
+            self.conn.commit()
+        bus.publish("campaigns", campaign_ids=[c["id"]], op="insert")
+
+    def add_campaigns(self, campaigns: List[Dict[str, Any]]):
+        """Inserts many campaigns in one transaction and publishes a single event."""
+        if not campaigns:
+            return
+        now = datetime.now().isoformat()
+        rows = [(
+            c["id"], c["name"], c["status"], c.get("budget", 0), c.get("spent", 0),
+            c.get("objective"), json.dumps(c.get("platforms", [])),
             json.dumps(c.get("strategy", {})), json.dumps(c.get("recommendation", {})),
             json.dumps(c.get("roi_forecast", {})), json.dumps(c.get("timeline", {})),
-            json.dumps(c.get("broadcast_log", {})), c.get("created_at", datetime.now().isoformat())
-        ))
-        self.conn.commit()
+            json.dumps(c.get("broadcast_log", {})), c.get("created_at", now)
+        ) for c in campaigns]
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                cursor.executemany("""
+                    INSERT INTO campaigns (id, name, status, budget, spent, objective, platforms, strategy, recommendation, roi_forecast, timeline, broadcast_log, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        bus.publish("campaigns", campaign_ids=[c["id"] for c in campaigns], op="insert")
 
     def log_metrics(self, campaign_id: str, platform: str, data: Dict[str, Any]):
-        cursor = self.conn.cursor()
-        cursor.execute("INSERT INTO metrics (campaign_id, platform, data, timestamp) VALUES (?, ?, ?, ?)",
-                       (campaign_id, platform, json.dumps(data), datetime.now().isoformat()))
-        self.conn.commit()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO metrics (campaign_id, platform, data, timestamp) VALUES (?, ?, ?, ?)",
+                           (campaign_id, platform, json.dumps(data), datetime.now().isoformat()))
+            self.conn.commit()
+        bus.publish("metrics", campaign_ids=[campaign_id])
+
+    def get_metric_history(self, since: str, campaign_id: str = None, fields: List[str] = ("impressions", "clicks", "conversions")) -> List[Dict[str, Any]]:
+        """
+        Metric snapshots taken at or after `since`, plus the latest earlier snapshot of every
+        (campaign, platform) series as a baseline, ordered by series then time.
+        Only the requested counters are extracted (in SQL) from the stored JSON.
+        """
+        columns = ", ".join(f"COALESCE(json_extract(m.data, '$.{f}'), 0) AS {f}" for f in fields)
+        scope = "AND m.campaign_id = ?" if campaign_id else ""
+        params = (since, *([campaign_id] if campaign_id else []))
+        sql = f"""
+            SELECT m.campaign_id, m.platform, m.timestamp, {columns}
+            FROM metrics m
+            JOIN (
+                SELECT campaign_id, platform, MAX(timestamp) AS ts FROM metrics
+                WHERE timestamp < ? {scope.replace('m.', '')}
+                GROUP BY campaign_id, platform
+            ) b ON b.campaign_id = m.campaign_id AND b.platform = m.platform AND b.ts = m.timestamp
+            UNION ALL
+            SELECT m.campaign_id, m.platform, m.timestamp, {columns}
+            FROM metrics m
+            WHERE m.timestamp >= ? {scope}
+            ORDER BY 1, 2, 3
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, params + params)
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
 
     def log_ai_decision(self, campaign_id: str, decision_type: str, data: Dict[str, Any]):
-        cursor = self.conn.cursor()
         formatted_now = datetime.now().strftime("%b %d, %I:%M %p")
-        cursor.execute("INSERT INTO ai_decisions (campaign_id, decision_type, data, timestamp) VALUES (?, ?, ?, ?)",
-                       (campaign_id, decision_type, json.dumps(data), formatted_now))
-        self.conn.commit()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT INTO ai_decisions (campaign_id, decision_type, data, timestamp) VALUES (?, ?, ?, ?)",
+                           (campaign_id, decision_type, json.dumps(data), formatted_now))
+            self.conn.commit()
+        bus.publish("insights", campaign_ids=[campaign_id])
 
     def get_insights(self, campaign_id: str = None) -> List[Dict[str, Any]]:
-        cursor = self.conn.cursor()
-        if campaign_id and campaign_id != 'all':
-            cursor.execute("SELECT * FROM ai_decisions WHERE campaign_id = ? ORDER BY timestamp DESC LIMIT 10", (campaign_id,))
-        else:
-            cursor.execute("SELECT * FROM ai_decisions ORDER BY timestamp DESC LIMIT 10")
-        rows = cursor.fetchall()
+        with self.lock:
+            cursor = self.conn.cursor()
+            if campaign_id and campaign_id != 'all':
+                cursor.execute("SELECT * FROM ai_decisions WHERE campaign_id = ? ORDER BY timestamp DESC LIMIT 10", (campaign_id,))
+            else:
+                cursor.execute("SELECT * FROM ai_decisions ORDER BY timestamp DESC LIMIT 10")
+            rows = cursor.fetchall()
 
         
         insights = []
@@ -125,20 +329,68 @@ class SQLiteDB:
         return insights
 
     def update_campaign_status(self, campaign_id: str, status: str):
-        cursor = self.conn.cursor()
-        cursor.execute("UPDATE campaigns SET status = ? WHERE id = ?", (status, campaign_id))
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE campaigns SET status = ? WHERE id = ?", (status, campaign_id))
+            self.conn.commit()
+            updated = cursor.rowcount > 0
+        if updated:
+            bus.publish("campaigns", campaign_ids=[campaign_id], op="update")
+        return updated
+
+    def apply_status_transitions(self, transitions: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Compare-and-set status changes in one transaction. Each {id, from, to, lifecycle} only applies
+        while the campaign is still in `from`; `lifecycle` is stored as broadcast_log.lifecycle.
+        Returns whether each transition was applied.
+        """
+        if not transitions:
+            return []
+        applied = []
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                for t in transitions:
+                    cursor.execute(f"""
+                        UPDATE campaigns SET status = ?, broadcast_log = json_set({BROADCAST_LOG_OBJECT}, '$.lifecycle', json(?))
+                        WHERE id = ? AND status = ?
+                    """, (t["to"], json.dumps(t["lifecycle"]), t["id"], t["from"]))
+                    applied.append(cursor.rowcount > 0)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        changed = [t["id"] for t, ok in zip(transitions, applied) if ok]
+        if changed:
+            bus.publish("campaigns", campaign_ids=changed, op="update")
+        return applied
+
+    def set_lifecycle_confirmations(self, transition_id: str, confirmations: Dict[str, str], state: str):
+        """Attaches AI confirmations to campaigns whose latest lifecycle record is still `transition_id`."""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.executemany("""
+                UPDATE campaigns SET broadcast_log = json_set(broadcast_log, '$.lifecycle.ai_confirmation', ?, '$.lifecycle.confirmation', ?)
+                WHERE id = ? AND json_extract(CASE WHEN json_valid(broadcast_log) THEN broadcast_log END, '$.lifecycle.transition_id') = ?
+            """, [(message, state, campaign_id, transition_id) for campaign_id, message in confirmations.items()])
+            self.conn.commit()
+        bus.publish("campaigns", campaign_ids=list(confirmations), op="update")
 
     def update_campaign(self, campaign_id: str, updates: Dict[str, Any]):
-        """Updates generic fields of a campaign."""
-        cursor = self.conn.cursor()
-        
+        """Updates generic fields of a campaign. broadcast_log.lifecycle survives a log replaced without one."""
         fields = []
         values = []
         
         for key, value in updates.items():
-            if key in ["platforms", "strategy", "recommendation", "roi_forecast", "timeline", "broadcast_log"]:
+            if key == "broadcast_log":
+                # A replacement log without its own lifecycle keeps the stored one (see apply_status_transitions)
+                fields.append(f"""broadcast_log = CASE
+                    WHEN json_type({BROADCAST_LOG_OBJECT}, '$.lifecycle') IS NOT NULL
+                         AND json_type(?) = 'object' AND json_type(?, '$.lifecycle') IS NULL
+                    THEN json_set(?, '$.lifecycle', json(json_extract({BROADCAST_LOG_OBJECT}, '$.lifecycle')))
+                    ELSE ? END""")
+                values.extend([json.dumps(value)] * 4)
+            elif key in JSON_COLUMNS:
                 fields.append(f"{key} = ?")
                 values.append(json.dumps(value))
             else:
@@ -151,14 +403,170 @@ class SQLiteDB:
             return False
             
         sql = f"UPDATE campaigns SET {', '.join(fields)} WHERE id = ?"
-        cursor.execute(sql, tuple(values))
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(sql, tuple(values))
+            self.conn.commit()
+            updated = cursor.rowcount > 0
+        if updated:
+            bus.publish("campaigns", campaign_ids=[campaign_id], op="update")
+        return updated
 
     def delete_campaign(self, campaign_id: str):
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
-        self.conn.commit()
-        return cursor.rowcount > 0
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
+            self.conn.commit()
+            deleted = cursor.rowcount > 0
+        if deleted:
+            bus.publish("campaigns", campaign_ids=[campaign_id], op="delete")
+        return deleted
+
+    def delete_campaigns(self, campaign_ids: List[str]) -> set:
+        """Deletes many campaigns in one transaction; returns the ids that existed."""
+        ids = list(dict.fromkeys(campaign_ids))
+        deleted = set()
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    cursor.execute(f"DELETE FROM campaigns WHERE id IN ({', '.join('?' * len(chunk))}) RETURNING id", chunk)
+                    deleted.update(row["id"] for row in cursor.fetchall())
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        if deleted:
+            bus.publish("campaigns", campaign_ids=[c for c in ids if c in deleted], op="delete")
+        return deleted
+
+    def log_agent_activity(self, entries: List[Dict[str, Any]]):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.executemany("INSERT INTO agent_activity (agent, role, message, timestamp) VALUES (?, ?, ?, ?)",
+                               [(e.get("agent"), e.get("role"), e.get("message"), e.get("timestamp")) for e in entries])
+            self.conn.commit()
+
+    def get_agent_activity(self, agent: str = None, since: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        clauses = []
+        params = []
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT * FROM agent_activity {where} ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit))
+            rows = cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    def get_cached_audit(self, campaign_id: str, fingerprint: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+        """Returns the cached audit if its fingerprint matches and it is younger than max_age_seconds."""
+        cutoff = (datetime.now() - timedelta(seconds=max_age_seconds)).isoformat()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT result FROM audit_cache WHERE campaign_id = ? AND fingerprint = ? AND created_at >= ?",
+                           (campaign_id, fingerprint, cutoff))
+            row = cursor.fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def cache_audit(self, campaign_id: str, fingerprint: str, result: Dict[str, Any]):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("INSERT OR REPLACE INTO audit_cache (campaign_id, fingerprint, result, created_at) VALUES (?, ?, ?, ?)",
+                           (campaign_id, fingerprint, json.dumps(result), datetime.now().isoformat()))
+            self.conn.commit()
+
+    # --- Background Jobs ---
+
+    def enqueue_job(self, job_id: str, kind: str, payload: Dict[str, Any], max_attempts: int = 3) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, run_after, created_at)
+                VALUES (?, ?, ?, 'queued', 0, ?, ?, ?)
+            """, (job_id, kind, json.dumps(payload), max_attempts, now, now))
+            self.conn.commit()
+        return self.get_job(job_id)
+
+    def claim_job(self, worker: str, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Atomically moves the oldest runnable job to 'running' and returns it."""
+        if not kinds:
+            return None
+        now = datetime.now().isoformat()
+        placeholders = ", ".join("?" for _ in kinds)
+        with self.lock:
+            cursor = self.conn.cursor()
+            # Single UPDATE so concurrent processes sharing the file can't claim the same row
+            cursor.execute(f"""
+                UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, started_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' AND run_after <= ? AND kind IN ({placeholders})
+                    ORDER BY created_at LIMIT 1
+                )
+            """, (worker, now, now, *kinds))
+            self.conn.commit()
+            if cursor.rowcount == 0:
+                return None
+            cursor.execute("SELECT * FROM jobs WHERE worker = ? AND status = 'running' AND started_at = ?", (worker, now))
+            row = cursor.fetchone()
+        return self._decode_job(row) if row else None
+
+    def complete_job(self, job_id: str, result: Any):
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, finished_at = ? WHERE id = ?",
+                           (json.dumps(result, default=str), datetime.now().isoformat(), job_id))
+            self.conn.commit()
+
+    def fail_job(self, job_id: str, error: str, retry_in: Optional[float] = None):
+        """Requeues the job after `retry_in` seconds, or marks it failed when no retry is given."""
+        now = datetime.now()
+        with self.lock:
+            cursor = self.conn.cursor()
+            if retry_in is not None:
+                cursor.execute("UPDATE jobs SET status = 'queued', error = ?, worker = NULL, run_after = ? WHERE id = ?",
+                               (error, (now + timedelta(seconds=retry_in)).isoformat(), job_id))
+            else:
+                cursor.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                               (error, now.isoformat(), job_id))
+            self.conn.commit()
+
+    def requeue_stale_jobs(self, lease_seconds: float) -> int:
+        """Returns jobs orphaned by a crashed worker (running past their lease) to the queue."""
+        cutoff = (datetime.now() - timedelta(seconds=lease_seconds)).isoformat()
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE jobs SET status = 'queued', worker = NULL, error = 'Lease expired; requeued'
+                WHERE status = 'running' AND started_at < ? AND attempts < max_attempts
+            """, (cutoff,))
+            requeued = cursor.rowcount
+            cursor.execute("""
+                UPDATE jobs SET status = 'failed', error = 'Lease expired; no attempts left', finished_at = ?
+                WHERE status = 'running' AND started_at < ?
+            """, (datetime.now().isoformat(), cutoff))
+            self.conn.commit()
+        return requeued
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+        return self._decode_job(row) if row else None
+
+    def _decode_job(self, row) -> Dict[str, Any]:
+        job = dict(row)
+        for field in ["payload", "result"]:
+            if job[field]:
+                job[field] = json.loads(job[field])
+        return job
 
 db = SQLiteDB()
@@ -0,0 +1,60 @@
+"""
+In-process publish/subscribe bus for data-change notifications.
+PlatformAPI and SQLiteDB publish after every write; read-side caches subscribe
+to learn which scopes went stale instead of re-reading everything on each request.
+
+Topics:
+    platform_data  platform=<name>, campaign_ids=[...] or None (whole file changed)
+    campaigns      campaign_ids=[...], op="insert" | "update" | "delete"
+    metrics        campaign_ids=[...]
+    snapshots      scopes=[...] (derived dashboard snapshots were rebuilt)
+    insights       campaign_ids=[...] (an AI decision was stored)
+
+Agent activity, the audit cache and the job table do not publish: no cacheable endpoint reads
+them, and activity is written continuously, which would invalidate every ETag on each flush.
+"""
+
+from typing import Any, Callable, Dict, List
+import threading
+import traceback
+import uuid
+
+# Distinguishes this process's data versions from those of a previous run (version restarts at 0)
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[..., Any]]] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Global data version: bumped by every publish, i.e. by every write to platform or DB data."""
+        return self._version
+
+    def subscribe(self, topic: str, callback: Callable[..., Any]):
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+    def unsubscribe(self, topic: str, callback: Callable[..., Any]):
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, topic: str, **payload):
+        """Calls subscribers synchronously on the writer's thread; they should only mark state dirty."""
+        with self._lock:
+            self._version += 1
+            callbacks = list(self._subscribers.get(topic, []))
+        for callback in callbacks:
+            try:
+                callback(topic=topic, **payload)
+            except Exception as e:
+                # A failing subscriber must never fail the write that triggered it
+                print(f"[EventBus] Subscriber for '{topic}' failed: {e}")
+                traceback.print_exc()
+
+bus = EventBus()
@@ -0,0 +1,140 @@
+"""
+Watches the platform data directory for out-of-band edits.
+Uses Linux inotify through ctypes when available and falls back to cheap
+mtime/size polling elsewhere. Callbacks receive the changed filename.
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Returns (libc, fd) for a non-blocking inotify instance, or None where inotify is unavailable."""
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        init = libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    return libc, fd
+
+
+class DirectoryWatcher:
+    """
+    Calls `on_change(filename)` for files in `directory` accepted by `include`.
+    Events are coalesced for `settle` seconds so a burst of writes to one file
+    yields a single callback.
+    """
+    def __init__(self, directory: str, on_change: Callable[[str], None],
+                 include: Callable[[str], bool] = lambda name: True,
+                 mode: str = "auto", poll_interval: float = 2.0, settle: float = 0.1):
+        self.directory = directory
+        self.on_change = on_change
+        self.include = include
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.backend: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None or self.mode == "off":
+            return
+        self._stop.clear()
+        inotify = _load_inotify() if self.mode in ("auto", "inotify") else None
+        if inotify is not None:
+            libc, fd = inotify
+            if libc.inotify_add_watch(fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+                os.close(fd)
+                inotify = None
+        if inotify is not None:
+            self.backend = "inotify"
+            target, args = self._run_inotify, (inotify[1],)
+        else:
+            self.backend = "poll"
+            target, args = self._run_poll, ()
+        self._thread = threading.Thread(target=target, args=args, name="platform-file-watcher", daemon=True)
+        self._thread.start()
+        print(f"Watching {self.directory} for platform file changes ({self.backend})")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _emit(self, names: Iterable[str]):
+        for name in sorted(set(names)):
+            try:
+                self.on_change(name)
+            except Exception as e:
+                print(f"[DirectoryWatcher] Handler failed for {name}: {e}")
+
+    def _run_inotify(self, fd: int):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                time.sleep(self.settle)
+                changed, overflow = set(), False
+                while True:
+                    try:
+                        buf = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        break
+                    offset = 0
+                    while offset + _EVENT_HEADER.size <= len(buf):
+                        _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                        offset += _EVENT_HEADER.size
+                        name = buf[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                        offset += length
+                        if mask & IN_Q_OVERFLOW:
+                            overflow = True
+                        elif name and self.include(name):
+                            changed.add(name)
+                if overflow:
+                    # Events were lost; treat every watched file as changed
+                    changed.update(n for n in os.listdir(self.directory) if self.include(n))
+                self._emit(changed)
+        finally:
+            os.close(fd)
+
+    def _signatures(self) -> Dict[str, Tuple[int, int]]:
+        signatures = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if self.include(entry.name):
+                        st = entry.stat()
+                        signatures[entry.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        return signatures
+
+    def _run_poll(self):
+        known = self._signatures()
+        while not self._stop.wait(self.poll_interval):
+            current = self._signatures()
+            changed = [n for n in current.keys() | known.keys() if current.get(n) != known.get(n)]
+            known = current
+            self._emit(changed)
@@ -0,0 +1,321 @@
+"""
+Local OpenAI Stand-in Server
+Speaks the chat-completions protocol so the agent pipeline can be benchmarked
+offline. Responses are deterministic per prompt and match each agent's schema.
+
+Usage:
+    python llm_stub_server.py --port 8100 --latency lognormal:800:0.4 --error-rate 0.02
+    OPENAI_BASE_URL=http://localhost:8100/v1 uvicorn main:app
+
+Latency specs (milliseconds):
+    fixed:MS | uniform:LO:HI | normal:MEAN:SD | lognormal:MEDIAN:SIGMA | exp:MEAN
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+
+
+class StubConfig:
+    """Runtime knobs for the stub. Read from the environment, overridable from the CLI."""
+    def __init__(self):
+        self.seed = int(os.getenv("STUB_LLM_SEED", "42"))
+        self.latency = os.getenv("STUB_LLM_LATENCY", "fixed:0")
+        self.error_rate = float(os.getenv("STUB_LLM_ERROR_RATE", "0"))
+        self.rate_limit_rate = float(os.getenv("STUB_LLM_RATE_LIMIT_RATE", "0"))
+        self.malformed_rate = float(os.getenv("STUB_LLM_MALFORMED_RATE", "0"))
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def reseed(self):
+        self._rng = random.Random(self.seed)
+
+    def sample_latency(self) -> float:
+        """Returns a latency in seconds drawn from the configured distribution."""
+        kind, *params = self.latency.split(":")
+        args = [float(p) for p in params]
+        with self._lock:
+            rng = self._rng
+            if kind == "fixed":
+                ms = args[0] if args else 0
+            elif kind == "uniform":
+                ms = rng.uniform(args[0], args[1])
+            elif kind == "normal":
+                ms = rng.gauss(args[0], args[1])
+            elif kind == "lognormal":
+                ms = rng.lognormvariate(math.log(max(args[0], 1e-6)), args[1])
+            elif kind == "exp":
+                ms = rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0
+            else:
+                raise ValueError(f"Unknown latency distribution: {kind}")
+        return max(0.0, ms) / 1000.0
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+
+config = StubConfig()
+app = FastAPI(title="LLM Stub Server")
+
+
+def _prompt_rng(prompt: str) -> random.Random:
+    """Seeds a generator from the prompt so identical prompts get identical answers."""
+    digest = hashlib.sha256(f"{config.seed}:{prompt}".encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def _count_tokens(text: str) -> int:
+    # Rough approximation of tiktoken counts (~4 characters per token)
+    return max(1, len(text) // 4)
+
+
+def _planner(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "strategy": "Phase spend from awareness into retargeting once CTR stabilises above benchmark.",
+        "milestones": ["Audience Seeding", "Creative Testing", "Scale Winners", "Performance Review"],
+        "priority": rng.choice(["Low", "Medium", "High"])
+    }
+
+
+def _recommender(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    picks = rng.sample(PLATFORMS, 3)
+    weights = [rng.uniform(1, 3) for _ in picks]
+    total = sum(weights)
+    return {
+        "platform_split": {p: round(w / total, 2) for p, w in zip(picks, weights)},
+        "reasoning": f"{picks[0]} shows the strongest yield for this objective in recent benchmarks."
+    }
+
+
+def _roi(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    match = re.search(r"₹\s*([\d.]+)", prompt)
+    budget = float(match.group(1)) if match else 10000.0
+    roi = round(rng.uniform(1.5, 4.5), 1)
+    return {
+        "projected_roi": roi,
+        "projected_revenue": round(budget * roi, 2),
+        "projected_conversions": int(budget / rng.uniform(20, 80)),
+        "confidence_score": f"{rng.randint(65, 95)}%"
+    }
+
+
+def _timeline(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    start = datetime.now().date()
+    names = ["Launch", "Optimization", "Scaling", "Review"]
+    planned = re.search(r"planned milestones, in order:\s*(.+)", prompt)
+    if planned:
+        names = [n.strip() for n in planned.group(1).split(";") if n.strip()]
+    step = max(1, 30 // len(names))
+    return {
+        "execution_timeline": [
+            {"milestone": f"Phase {i + 1}: {name}", "date": (start + timedelta(days=i * step)).isoformat()}
+            for i, name in enumerate(names)
+        ],
+        "duration_days": 30
+    }
+
+
+def _consistency(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    score = round(rng.uniform(0.6, 0.98), 2)
+    return {
+        "consistency_score": score,
+        "status": "Green" if score > 0.85 else "Amber" if score > 0.7 else "Red",
+        "audit_note": "Tone and sentiment are aligned across the active channels."
+    }
+
+
+def _lifecycle(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    match = re.search(r"Requested Action:\s*(\w+)", prompt)
+    action = match.group(1) if match else "Activate"
+    new_status = {"Pause": "Paused", "Halt": "Paused", "Terminate": "Terminated"}.get(action, "Active")
+    return {
+        "new_status": new_status,
+        "ai_confirmation": f"Command authorized. Node status updated to {new_status}.",
+        "reasoning": f"'{action}' maps directly to the {new_status} state."
+    }
+
+
+def _cost_insights(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    platform = rng.choice(PLATFORMS)
+    waste = rng.randint(500, 5000)
+    return {
+        "total_waste_identified": f"₹{waste}",
+        "primary_cost_driver": f"High CPC segments on {platform}",
+        "recommended_actions": [
+            {"action": f"Pause low-CTR ad sets on {platform}", "platform": platform,
+             "potential_savings": f"₹{int(waste * 0.6)}", "timeline": "Immediate (24-48 hours)"}
+        ],
+        "quick_wins": ["Cap frequency at 3 per user", "Exclude converted audiences"],
+        "projected_monthly_savings": f"₹{waste * 4}"
+    }
+
+
+def _optimization_insights(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    platform = rng.choice(PLATFORMS)
+    value = rng.randint(1000, 10000)
+    return {
+        "total_opportunity_value": f"₹{value}",
+        "primary_growth_driver": f"{platform} high-ROI segments",
+        "scaling_recommendations": [
+            {"action": f"Increase {platform} budget by 40%", "platform": platform,
+             "additional_budget_needed": f"₹{int(value * 0.3)}",
+             "projected_revenue_increase": f"₹{int(value * 0.6)}", "timeline": "1-2 weeks"}
+        ],
+        "quick_wins": ["Duplicate winning ad sets", "Raise bids on converting keywords"],
+        "projected_monthly_uplift": f"₹{value * 3}"
+    }
+
+
+def _strategy(prompt: str, rng: random.Random) -> List[Dict[str, Any]]:
+    worst, best = rng.sample(PLATFORMS, 2)
+    return [
+        {
+            "decision_type": "Cost Reduction",
+            "performance_analysis": {
+                "summary": f"{worst} carries the highest CPC with ROI under 1.5x. Trimming its spend frees budget for stronger channels.",
+                "winning_segment": best,
+                "sentiment_leader": best
+            },
+            "budget_optimization": {"action": f"Reduce {worst} spend by 35%"}
+        },
+        {
+            "decision_type": "Results Optimization",
+            "performance_analysis": {
+                "summary": f"{best} leads on ROI and CTR. Scaling its top ad sets should lift revenue at a stable CPA.",
+                "winning_segment": f"{best} Lookalike Audiences",
+                "sentiment_leader": best
+            },
+            "budget_optimization": {"action": f"Increase {best} budget by 40%"}
+        }
+    ]
+
+
+# Schema marker -> response builder. Checked in order, first match wins.
+SCHEMA_HANDLERS = [
+    ('"total_waste_identified"', _cost_insights),
+    ('"total_opportunity_value"', _optimization_insights),
+    ('"decision_type"', _strategy),
+    ('"new_status"', _lifecycle),
+    ('"consistency_score"', _consistency),
+    ('"execution_timeline"', _timeline),
+    ('"projected_roi"', _roi),
+    ('"platform_split"', _recommender),
+    ('"milestones"', _planner),
+]
+
+
+def build_reply(prompt: str) -> str:
+    """Returns the assistant message content for a prompt."""
+    rng = _prompt_rng(prompt)
+    if "strictly valid JSON" in prompt:
+        for marker, handler in SCHEMA_HANDLERS:
+            if marker in prompt:
+                return json.dumps(handler(prompt, rng))
+        return json.dumps({"message": "Acknowledged."})
+    return rng.choice([
+        "Broadcast confirmed: assets are live and verified across all selected channels.",
+        "Reallocate 15% of spend from the lowest-ROI channel to the top performer.",
+        "Switch the hero creative to short-form UGC video with a bold first frame.",
+        "Lapsed high-value buyers: responsive to time-limited loyalty offers."
+    ])
+
+
+def _error(status: int, message: str, err_type: str) -> JSONResponse:
+    return JSONResponse(status_code=status, content={
+        "error": {"message": message, "type": err_type, "param": None, "code": None}
+    })
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt = "\n".join(m.get("content", "") for m in messages if isinstance(m.get("content"), str))
+
+    await asyncio.sleep(config.sample_latency())
+
+    roll = config.roll()
+    if roll < config.rate_limit_rate:
+        return _error(429, "Rate limit reached for requests (stub).", "requests")
+    if roll < config.rate_limit_rate + config.error_rate:
+        return _error(500, "The server had an error while processing your request (stub).", "server_error")
+
+    content = build_reply(prompt)
+    if config.roll() < config.malformed_rate:
+        content = content[: len(content) // 2]
+
+    prompt_tokens = _count_tokens(prompt)
+    completion_tokens = _count_tokens(content)
+    return {
+        "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+@app.get("/v1/models")
+def list_models():
+    return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "stub"}]}
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "latency": config.latency,
+        "error_rate": config.error_rate,
+        "rate_limit_rate": config.rate_limit_rate,
+        "malformed_rate": config.malformed_rate,
+        "seed": config.seed
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI chat-completions stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--seed", type=int, default=config.seed)
+    parser.add_argument("--latency", default=config.latency, help="e.g. lognormal:800:0.4")
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="Fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate, help="Fraction of 429 responses")
+    parser.add_argument("--malformed-rate", type=float, default=config.malformed_rate, help="Fraction of truncated JSON replies")
+    args = parser.parse_args()
+
+    config.seed = args.seed
+    config.latency = args.latency
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.malformed_rate = args.malformed_rate
+    config.reseed()
+    config.sample_latency()  # Fail fast on a bad latency spec
+
+    uvicorn.run(app, host=args.host, port=args.port)
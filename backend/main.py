@@ -20,16 +20,23 @@ def new_request(self, method, url, *args, **kwargs):
 requests.Session.request = new_request
 # --------------------------------------------------
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+import anyio
+import codecs
 import uuid
 
 import json
 from platforms import PlatformAPI
 from database import db
+from telemetry import registry
+from events import bus, BOOT_ID
+from compression import CompressionMiddleware, FastJSONResponse
 from agents import (
     ConsistencyAgent,
     AuthAgent,
@@ -39,6 +46,7 @@ from agents import (
     ROIAgent,
     InsightsAgent
 )
+from agents.forecasting import DEFAULT_TRIALS, shutdown_pools
 
 app = FastAPI(title="AI-Driven Marketing Campaign API")
 
@@ -50,6 +58,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024")))
+
+# --- HTTP Caching ---
+# Read endpoints are validated against the global data version, so a matching
+# If-None-Match is answered with 304 before any aggregation runs.
+CACHEABLE_EXACT = {"/api/campaigns", "/api/insights", "/api/leaderboard"}
+CACHEABLE_PREFIXES = ("/api/dashboard/",)
+CACHE_CONTROL = f"private, max-age={int(os.getenv('HTTP_CACHE_MAX_AGE', '0'))}, must-revalidate"
+
+def is_cacheable(path: str) -> bool:
+    if path in CACHEABLE_EXACT or path.startswith(CACHEABLE_PREFIXES):
+        return True
+    return path.startswith("/api/platforms/") and path.endswith("/stats")
+
+def current_etag() -> str:
+    # The hour is included because trends/trajectory buckets move with the clock
+    return f'W/"{BOOT_ID}-{bus.version}-{datetime.now().strftime("%Y%m%d%H")}"'
+
+@app.middleware("http")
+async def version_etag(request: Request, call_next):
+    if request.method != "GET" or not is_cacheable(request.url.path):
+        return await call_next(request)
+    etag = current_etag()
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
 
 # --- Initialize Required Agents for Routes ---
 consistency_auditor = ConsistencyAgent()
@@ -74,10 +113,40 @@ class CampaignCreate(BaseModel):
     objective: str # e.g., "Sales", "Leads", "Traffic"
     platforms: List[str]
 
+class BulkStatusRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=5000)
+    action: str
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=5000)
+
+class BudgetAllocationRequest(BaseModel):
+    campaign_ids: Optional[List[str]] = None
+    min_share: float = Field(0.05, ge=0, le=1)
+    max_share: float = Field(0.8, gt=0, le=1)
+
+    @model_validator(mode="after")
+    def shares_ordered(self):
+        if self.min_share > self.max_share:
+            raise ValueError("min_share cannot exceed max_share")
+        return self
+
+class ROIForecastRequest(BaseModel):
+    campaign_ids: Optional[List[str]] = None
+    trials: int = Field(DEFAULT_TRIALS, ge=100, le=1_000_000)
+
 # --- Endpoints ---
 
 from services.campaign_service import campaign_service
+from agents.orchestrator import InvalidTransition
 from services.dashboard_service import dashboard_service
+from services.job_service import job_service
+from services.snapshot_service import snapshot_service
+from services.import_service import import_service
+
+def accepted(job: Dict[str, Any]) -> JSONResponse:
+    """202 response pointing the client at the job status endpoint."""
+    return JSONResponse(status_code=202, content=job)
 
 # --- Endpoints ---
 
@@ -85,24 +154,80 @@ from services.dashboard_service import dashboard_service
 def read_root():
     return {"message": "AI Marketing Platform API is running", "status": "Ready", "ai_status": "Online"}
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint (per-agent LLM latency, tokens, parse failures, fallbacks)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+CAMPAIGN_LIST_PARAMS = {"status", "objective", "platform", "q", "sort", "order", "limit", "cursor", "fields"}
+
 @app.get("/api/campaigns")
-def get_campaigns():
-    return campaign_service.get_all_campaigns()
+def get_campaigns(request: Request, status: Optional[str] = None, objective: Optional[str] = None,
+                  platform: Optional[str] = None, q: Optional[str] = None,
+                  sort: str = "created_at", order: str = Query("desc", pattern="^(asc|desc)$"),
+                  limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                  fields: Optional[str] = None):
+    # Without list parameters, keep returning the plain enriched array existing clients expect
+    if not CAMPAIGN_LIST_PARAMS.intersection(request.query_params.keys()):
+        return FastJSONResponse(campaign_service.get_all_campaigns())
+    try:
+        page = campaign_service.list_campaigns(
+            status=status, objective=objective, platform=platform, search=q, sort=sort, order=order,
+            limit=limit, cursor=cursor, fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(page)
 
 @app.post("/api/campaigns")
-def create_campaign(campaign: CampaignCreate):
+def create_campaign(campaign: CampaignCreate, run_async: bool = Query(False, alias="async")):
     try:
+        if run_async:
+            return accepted(job_service.submit("create_campaign", campaign.dict()))
         return campaign_service.create_campaign(campaign.dict())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def iter_request_lines(request: Request):
+    """
+    Blocking line iterator over a streamed request body, for use from a worker thread.
+    Chunks are pulled from the event loop on demand, so the body is never buffered whole.
+    """
+    chunks = request.stream().__aiter__()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(chunks.__anext__)
+        except StopAsyncIteration:
+            break
+        parts = (pending + decoder.decode(chunk)).split("\n")
+        pending = parts.pop()
+        for part in parts:
+            yield part + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+@app.post("/api/campaigns/import")
+async def import_campaigns(request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+                           enrich: bool = False):
+    """Bulk import from a streamed CSV or NDJSON body. Rows skip the agent pipeline unless `enrich` queues it."""
+    content_type = request.headers.get("content-type", "")
+    fmt = format or ("ndjson" if "json" in content_type else "csv")
+    try:
+        summary = await run_in_threadpool(import_service.import_lines, iter_request_lines(request), fmt, enrich)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8: {e}")
+    return summary
+
 @app.get("/api/campaigns/{campaign_id}/metrics")
 def get_campaign_metrics(campaign_id: str):
     # 1. Fetch real simulated data from files via PlatformAPI
     raw_data = PlatformAPI.get_all_platforms_data(campaign_id)
     
     # 2. Use Brand Auditor (Consistency Agent) to analyze alignment
-    analysis = consistency_auditor.run(raw_data)
+    analysis = consistency_auditor.audit(campaign_id, raw_data)
     
     # 3. Log metrics to SQLite for persistence
     for platform_metrics in raw_data:
@@ -142,7 +267,7 @@ def get_platform_data(platform: str):
         with open(file_path, 'r') as f:
             data = json.load(f)
         
-        return data
+        return FastJSONResponse(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -155,49 +280,80 @@ def get_platform_stats(platform: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/campaigns/{campaign_id}/optimize")
-def optimize_campaign(campaign_id: str, platform: Optional[str] = None):
+def optimize_campaign(campaign_id: str, platform: Optional[str] = None, run_async: bool = Query(False, alias="async")):
     try:
-        from typing import Optional
-        from fastapi import Query
-        # platform = request.query_params.get('platform') # In FastAPI we add it to signature
+        if run_async:
+            return accepted(job_service.submit("optimize_campaign", {"campaign_id": campaign_id, "platform": platform}))
         return optimization_service.optimize_campaign(campaign_id, platform=platform)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_detailed_insights(campaign_id: Optional[str] = None) -> Dict[str, Any]:
+    """Runs the InsightsAgent cost/optimization pipeline for one campaign or the whole portfolio."""
+    # Fetch platform data
+    if campaign_id and campaign_id != 'all':
+        platforms_data = PlatformAPI.get_all_platforms_data(campaign_id)
+    else:
+        # Aggregate data from all campaigns
+        campaigns = db.get_campaigns()
+        index = PlatformAPI.get_platforms_data_index()
+        all_data = []
+        for c in campaigns:
+            all_data.extend(index.get(c["id"], []))
+        platforms_data = all_data
+    
+    if not platforms_data:
+        return {"error": "No campaign data available"}
+    
+    # Generate detailed insights
+    cost_insights = insights_agent.generate_cost_reduction_insights(platforms_data)
+    optimization_insights = insights_agent.generate_optimization_insights(platforms_data)
+    
+    return {
+        "cost_reduction": cost_insights,
+        "results_optimization": optimization_insights,
+        "generated_at": datetime.now().isoformat()
+    }
+
 @app.get("/api/insights/detailed")
-async def get_detailed_insights(campaign_id: Optional[str] = None):
+async def get_detailed_insights(campaign_id: Optional[str] = None, run_async: bool = Query(False, alias="async")):
     """Get detailed cost reduction and optimization insights"""
     try:
-        # Fetch platform data
-        if campaign_id and campaign_id != 'all':
-            platforms_data = PlatformAPI.get_all_platforms_data(campaign_id)
-        else:
-            # Aggregate data from all campaigns
-            campaigns = db.get_campaigns()
-            all_data = []
-            for c in campaigns:
-                all_data.extend(PlatformAPI.get_all_platforms_data(c["id"]))
-            platforms_data = all_data
-        
-        if not platforms_data:
-            return {"error": "No campaign data available"}
-        
-        # Generate detailed insights
-        cost_insights = insights_agent.generate_cost_reduction_insights(platforms_data)
-        optimization_insights = insights_agent.generate_optimization_insights(platforms_data)
-        
-        return {
-            "cost_reduction": cost_insights,
-            "results_optimization": optimization_insights,
-            "generated_at": datetime.now().isoformat()
-        }
+        if run_async:
+            return accepted(job_service.submit("detailed_insights", {"campaign_id": campaign_id}))
+        return build_detailed_insights(campaign_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/insights")
-async def get_active_insights(campaign_id: Optional[str] = None):
-    """Get active AI insights for dashboard display"""
+@app.get("/api/jobs/{job_id}")
+def get_job_status(job_id: str):
+    job = job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# --- Background Jobs ---
+# Campaign creation registers platform entries before the DB insert, so it is not retried blindly.
+job_service.register("create_campaign", campaign_service.create_campaign, max_attempts=1)
+job_service.register("optimize_campaign", lambda p: optimization_service.optimize_campaign(p["campaign_id"], platform=p.get("platform")))
+job_service.register("detailed_insights", lambda p: build_detailed_insights(p.get("campaign_id")))
+job_service.register("confirm_transition", campaign_service.confirm_transition)
+job_service.register("enrich_campaigns", lambda p: campaign_service.enrich_imported_campaigns(p["campaign_ids"]))
+
+@app.on_event("startup")
+def start_job_workers():
+    job_service.start()
+    campaign_service.start_watching()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_service.stop()
+    campaign_service.stop_watching()
+    shutdown_pools()
+
+def active_insights(campaign_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Stored AI decisions for the scope, or freshly derived insights when none exist."""
     try:
         # Fetch from DB for historical, but also generate fresh ones
         db_insights = db.get_insights(campaign_id)
@@ -220,6 +376,11 @@ async def get_active_insights(campaign_id: Optional[str] = None):
         # Fallback to fresh generation on any error
         return dashboard_service.get_ai_insights(campaign_id)
 
+@app.get("/api/insights")
+async def get_active_insights(campaign_id: Optional[str] = None):
+    """Get active AI insights for dashboard display"""
+    return active_insights(campaign_id)
+
 
 @app.get("/api/insights/test")
 async def test_insights():
@@ -256,15 +417,28 @@ async def test_insights():
             "fallback": "Using simulated insights"
         }
 
+@app.post("/api/campaigns/bulk/status")
+def bulk_update_campaign_status(request: BulkStatusRequest):
+    """Applies one action to many campaigns in one transaction; per-id results carry an error and code on failure."""
+    return campaign_service.bulk_update_status(request.ids, request.action)
+
+@app.post("/api/campaigns/bulk/delete")
+def bulk_delete_campaigns(request: BulkDeleteRequest):
+    """Deletes many campaigns with one transaction and at most one rewrite per platform registry."""
+    return campaign_service.bulk_delete(request.ids)
+
 @app.post("/api/campaigns/{campaign_id}/status")
 def update_campaign_status(campaign_id: str, status_update: Dict[str, str]):
     action = status_update.get("action") or status_update.get("status")
     if not action:
         raise HTTPException(status_code=400, detail="Action or status is required")
     
-    result = campaign_service.update_status(campaign_id, action)
+    try:
+        result = campaign_service.update_status(campaign_id, action)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=400 if e.unknown_action else 409, detail=str(e))
     if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
+        raise HTTPException(status_code=result.get("code", 404), detail=result["error"])
     return result
 
 @app.put("/api/campaigns/{campaign_id}")
@@ -282,38 +456,81 @@ def delete_campaign(campaign_id: str):
 
 @app.get("/api/dashboard/stats")
 async def get_dashboard_stats(campaign_id: Optional[str] = None):
-    return dashboard_service.get_stats(campaign_id)
+    return snapshot_service.get_stats(campaign_id)
 
 @app.get("/api/dashboard/trends")
-async def get_dashboard_trends(campaign_id: Optional[str] = None, days: int = 30):
-    return dashboard_service.get_performance_trends(campaign_id, days)
+async def get_dashboard_trends(campaign_id: Optional[str] = None, days: int = Query(30, ge=1, le=730),
+                               granularity: str = Query("day", pattern="^(day|hour)$")):
+    """Daily (or hourly) impressions/clicks/conversions derived from stored metric snapshots."""
+    return dashboard_service.get_performance_trends(campaign_id, days, granularity)
 
 @app.get("/api/dashboard/revenue-trajectory")
-async def get_dashboard_revenue_trajectory(campaign_id: Optional[str] = None, days: int = 30):
-    return dashboard_service.get_revenue_trajectory(campaign_id, days)
+async def get_dashboard_revenue_trajectory(campaign_id: Optional[str] = None, days: int = Query(30, ge=1, le=730)):
+    revenue, version = snapshot_service.lookup(campaign_id, "total_revenue")
+    return dashboard_service.get_revenue_trajectory(campaign_id, days, revenue=revenue, version=version)
+
+def all_platform_stats() -> List[Dict[str, Any]]:
+    platforms = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+    all_stats = []
+    
+    for platform in platforms:
+        try:
+            stats = PlatformAPI.get_platform_aggregate_stats(platform)
+            print(f"Stats for {platform}: {stats}")
+            all_stats.append(stats)
+        except Exception as e:
+            print(f"Error getting stats for {platform}: {e}")
+            continue
+    
+    print(f"Final all_stats: {all_stats}")
+    return all_stats
 
 @app.get("/api/platforms/all/stats")
 def get_all_platforms_stats():
     """Get aggregated stats for all platforms"""
     try:
-        platforms = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
-        all_stats = []
-        
-        for platform in platforms:
-            try:
-                stats = PlatformAPI.get_platform_aggregate_stats(platform)
-                print(f"Stats for {platform}: {stats}")
-                all_stats.append(stats)
-            except Exception as e:
-                print(f"Error getting stats for {platform}: {e}")
-                continue
-        
-        print(f"Final all_stats: {all_stats}")
-        return all_stats
+        return all_platform_stats()
     except Exception as e:
         print(f"Error in get_all_platforms_stats: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/leaderboard")
+def get_leaderboard(metric: str = Query("roi", pattern="^(roi|spend|revenue|conversions)$"),
+                    platform: Optional[str] = None, k: int = Query(10, ge=1, le=100)):
+    """Top-k campaigns by ROI, spend, revenue or conversions, across all platforms or within one."""
+    return snapshot_service.leaderboard(metric, k, platform)
+
+DASHBOARD_SECTIONS = ["stats", "trends", "trajectory", "insights", "platform_stats"]
+
+@app.get("/api/dashboard/bundle")
+def get_dashboard_bundle(campaign_id: Optional[str] = None, days: int = Query(30, ge=1, le=730),
+                         sections: str = "stats,trajectory",
+                         granularity: str = Query("day", pattern="^(day|hour)$")):
+    """
+    Several dashboard sections in one response (comma-separated `sections`).
+    The scope's stats snapshot is resolved once and shared by every section that needs it.
+    """
+    requested = [s.strip() for s in sections.split(",") if s.strip()]
+    unknown = [s for s in requested if s not in DASHBOARD_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}. Valid: {', '.join(DASHBOARD_SECTIONS)}")
+
+    bundle = {}
+    stats = snapshot_service.get_stats(campaign_id) if {"stats", "trajectory"} & set(requested) else None
+    for section in requested:
+        if section == "stats":
+            bundle["stats"] = stats
+        elif section == "trends":
+            bundle["trends"] = dashboard_service.get_performance_trends(campaign_id, days, granularity)
+        elif section == "trajectory":
+            bundle["trajectory"] = dashboard_service.get_revenue_trajectory(
+                campaign_id, days, revenue=stats.get("total_revenue"), version=stats["snapshot_version"])
+        elif section == "insights":
+            bundle["insights"] = active_insights(campaign_id)
+        elif section == "platform_stats":
+            bundle["platform_stats"] = all_platform_stats()
+    return FastJSONResponse(bundle)
+
 
 
 @app.post("/api/auth/login")
@@ -324,13 +541,31 @@ def login(request: LoginRequest):
 def get_audience_insight(platform: str):
     return audience_agent.run({"platform": platform})
 
+@app.get("/api/agents/activity")
+def get_agent_activity(agent: Optional[str] = None, since: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """Persisted agent activity log, newest first. `since` is an ISO timestamp."""
+    return db.get_agent_activity(agent=agent, since=since, limit=limit)
+
 @app.post("/api/agents/creative/optimize")
 def optimize_creative(data: Dict[str, Any]):
     return creative_agent.run(data)
 
 @app.post("/api/agents/budget/optimize")
 def optimize_budget(data: Dict[str, Any]):
-    return budget_agent.run(data)
+    try:
+        return budget_agent.run(data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.post("/api/agents/budget/allocate")
+def allocate_budgets(request: BudgetAllocationRequest):
+    """Numeric platform split for many campaigns at once (all campaigns if no ids are given); no LLM calls."""
+    return budget_agent.allocate_portfolio(request.campaign_ids, request.min_share, request.max_share)
+
+@app.post("/api/agents/roi/forecast")
+def forecast_roi(request: ROIForecastRequest):
+    """Monte Carlo ROI forecast with percentile bands for many campaigns at once (all if no ids are given); no LLM calls."""
+    return roi_analyst.forecast_campaigns(request.campaign_ids, request.trials)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,12 +1,18 @@
 import json
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from events import bus
 
 # Adjust logic to find 'data' correctly relative to this file
 # Assuming this file is in backend/ and data/ is in backend/data/
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data") 
+DATA_DIR = os.getenv("PLATFORM_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+# Monte Carlo trials behind the forecast_data of bulk-added registry entries (single adds use the full count)
+REGISTRY_FORECAST_TRIALS = int(os.getenv("REGISTRY_FORECAST_TRIALS", "250"))
 
 class PlatformAPI:
+    # (mtime_ns, size) of each file as this process last wrote it, to tell our writes from external edits
+    _written_signatures: Dict[str, Any] = {}
+
     @staticmethod
     def _read_json(filename: str) -> Dict[str, Any]:
         path = os.path.join(DATA_DIR, filename)
@@ -20,10 +26,23 @@ class PlatformAPI:
         return {}
 
     @staticmethod
-    def _write_json(filename: str, data: Dict[str, Any]):
+    def _write_json(filename: str, data: Dict[str, Any], campaign_ids: Optional[List[str]] = None):
+        """Writes a platform file and announces it; `campaign_ids=None` means any campaign may have changed."""
         path = os.path.join(DATA_DIR, filename)
         with open(path, "w") as f:
             json.dump(data, f, indent=4)
+        st = os.stat(path)
+        PlatformAPI._written_signatures[filename] = (st.st_mtime_ns, st.st_size)
+        bus.publish("platform_data", platform=filename.replace(".json", ""), campaign_ids=campaign_ids)
+
+    @staticmethod
+    def is_own_write(filename: str) -> bool:
+        """True if the file on disk is exactly what this process last wrote."""
+        try:
+            st = os.stat(os.path.join(DATA_DIR, filename))
+        except FileNotFoundError:
+            return False
+        return PlatformAPI._written_signatures.get(filename) == (st.st_mtime_ns, st.st_size)
 
     @staticmethod
     def _ensure_platform_file(platform: str):
@@ -32,7 +51,7 @@ class PlatformAPI:
         path = os.path.join(DATA_DIR, filename)
         if not os.path.exists(path):
             print(f"Creating new platform registry: {filename}")
-            PlatformAPI._write_json(filename, {"platform": platform, "campaigns": {}})
+            PlatformAPI._write_json(filename, {"platform": platform, "campaigns": {}}, campaign_ids=[])
 
     @staticmethod
     def get_platform_metrics(campaign_id: str, platform: str) -> Dict[str, Any]:
@@ -70,6 +89,30 @@ class PlatformAPI:
                         "audience_insight": metrics.get("audience_insight", {})
                     })
         return results
+
+    @staticmethod
+    def get_platforms_data_index() -> Dict[str, List[Dict[str, Any]]]:
+        """
+        `get_all_platforms_data` for every campaign at once: {campaign_id: [platform entries]}.
+        One directory listing and one parse per platform file; entries keep the listing order.
+        """
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        for filename in os.listdir(DATA_DIR):
+            if filename.endswith(".json") and "sim_campaign" not in filename and "campaign_mapping" not in filename:
+                platform_name = filename.replace(".json", "")
+                data = PlatformAPI._read_json(filename)
+                for c_id, c_data in data.get("campaigns", {}).items():
+                    if c_data:
+                        metrics = c_data.get("metrics", {})
+                    else:
+                        metrics = PlatformAPI.get_platform_metrics(c_id, platform_name)
+                    index.setdefault(str(c_id), []).append({
+                        "platform": platform_name,
+                        "metrics": metrics,
+                        "audience_insight": metrics.get("audience_insight", {})
+                    })
+        return index
+
     @staticmethod
     def get_all_campaigns_in_platform(platform: str) -> List[Dict[str, Any]]:
         """Returns all campaign data present in a specific platform file."""
@@ -92,6 +135,45 @@ class PlatformAPI:
         filename = f"{platform}.json"
         data = PlatformAPI._read_json(filename)
         
+        forecast_data = PlatformAPI._forecasts(platform, data, [budget])[0]
+        data["campaigns"][str(campaign_id)] = {
+            "name": campaign_name,
+            "metrics": PlatformAPI._initial_metrics(platform, budget, target_audience, forecast_data)
+        }
+        
+        PlatformAPI._write_json(filename, data, campaign_ids=[str(campaign_id)])
+
+    @staticmethod
+    def add_campaigns_to_platform(platform: str, campaigns: List[Dict[str, Any]]):
+        """
+        Registers many campaigns ({id, name, budget, target_audience}) on one platform
+        with a single read and a single write of the platform file.
+        """
+        if not campaigns:
+            return
+        PlatformAPI._ensure_platform_file(platform)
+        filename = f"{platform}.json"
+        data = PlatformAPI._read_json(filename)
+        registry = data.setdefault("campaigns", {})
+        forecasts = PlatformAPI._forecasts(platform, data, [c.get("budget", 0) for c in campaigns], REGISTRY_FORECAST_TRIALS)
+        for c, forecast_data in zip(campaigns, forecasts):
+            registry[str(c["id"])] = {
+                "name": c["name"],
+                "metrics": PlatformAPI._initial_metrics(platform, c.get("budget", 0), c.get("target_audience", "0"), forecast_data)
+            }
+        PlatformAPI._write_json(filename, data, campaign_ids=[str(c["id"]) for c in campaigns])
+
+    @staticmethod
+    def _forecasts(platform: str, data: Dict[str, Any], budgets: List[float], trials: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Monte Carlo forecast per budget, from the rates of the campaigns already in this platform's registry."""
+        from agents.forecasting import DEFAULT_TRIALS, estimate_distributions, forecast_platform_budgets
+
+        dist = estimate_distributions(c.get("metrics", {}) for c in data.get("campaigns", {}).values())
+        return forecast_platform_budgets(platform, [float(b or 0) for b in budgets], dist, trials=trials or DEFAULT_TRIALS)
+
+    @staticmethod
+    def _initial_metrics(platform: str, budget: float = 0, target_audience: str = "0",
+                         forecast_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         # Initialize with zero/empty values
         is_email = (platform.lower() == "email")
         
@@ -99,11 +181,7 @@ class PlatformAPI:
         import random
         
         # Forecast Data
-        forecast_data = {
-            "projected_roi": round(random.uniform(1.5, 4.5), 1),
-            "projected_conversions": random.randint(50, 500),
-            "confidence_score": f"{random.randint(65, 95)}%"
-        }
+        forecast_data = forecast_data or PlatformAPI._forecasts(platform, {}, [budget])[0]
         schedule_data = {
             "duration_days": 30, # Default
             "next_run": "",
@@ -167,13 +245,7 @@ class PlatformAPI:
                     "Ad 2": "Testing"
                 }
             }
-
-        data["campaigns"][str(campaign_id)] = {
-            "name": campaign_name,
-            "metrics": metrics
-        }
-        
-        PlatformAPI._write_json(filename, data)
+        return metrics
 
     @staticmethod
     def get_platform_aggregate_stats(platform: str) -> Dict[str, Any]:
@@ -276,6 +348,19 @@ class PlatformAPI:
         
         if str(campaign_id) in data.get("campaigns", {}):
             del data["campaigns"][str(campaign_id)]
-            PlatformAPI._write_json(filename, data)
+            PlatformAPI._write_json(filename, data, campaign_ids=[str(campaign_id)])
             print(f"Removed campaign {campaign_id} from {platform}")
 
+    @staticmethod
+    def delete_campaigns_from_platform(campaign_ids: List[str], platform: str) -> List[str]:
+        """Removes many campaigns from one platform file with at most one rewrite; returns the ids removed."""
+        filename = f"{platform}.json"
+        if not os.path.exists(os.path.join(DATA_DIR, filename)):
+            return []
+        data = PlatformAPI._read_json(filename)
+        registry = data.get("campaigns", {})
+        removed = [str(c_id) for c_id in campaign_ids if registry.pop(str(c_id), None) is not None]
+        if removed:
+            PlatformAPI._write_json(filename, data, campaign_ids=removed)
+            print(f"Removed {len(removed)} campaign(s) from {platform}")
+        return removed
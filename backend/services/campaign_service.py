@@ -1,39 +1,116 @@
-from typing import Dict, Any, List
-from agents.orchestrator import CampaignOrchestratorAgent
-from database import db
+from typing import Dict, Any, List, Optional
+import base64
+import itertools
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from agents.orchestrator import CampaignOrchestratorAgent, InvalidTransition, resolve_transition
+from database import db, CAMPAIGN_COLUMNS, CAMPAIGN_SORTS
+from events import bus
+from file_watcher import DirectoryWatcher
+import platforms as platforms_module
 from platforms import PlatformAPI
+from services.job_service import job_service
+
+SYNCED_PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
 
 class CampaignService:
     def __init__(self):
         self.orchestrator = CampaignOrchestratorAgent()
+        # platform -> {campaign_id: name} as last seen in that platform file
+        self._file_index: Dict[str, Dict[str, str]] = {}
+        self._sync_lock = threading.Lock()
+        self.watcher = None
+        # Enrichment rollups for get_all_campaigns, keyed by a platform data version
+        self._rollups: Optional[Dict[str, Dict[str, Any]]] = None
+        self._rollups_version = -1
+        self._data_versions = itertools.count(1)
+        self._platform_data_version = 0
+        self._rollup_lock = threading.Lock()
+        # (action, from, to) -> LLM confirmation, reused for every campaign making that transition
+        self._confirmations: Dict[tuple, str] = {}
+        bus.subscribe("platform_data", self._on_platform_data)
         self.ensure_campaigns_synced()
 
     def ensure_campaigns_synced(self):
         """Ensures that campaigns found in platform JSON files exist in the SQLite DB."""
         print("Syncing File System with Database...")
-        file_campaigns = PlatformAPI.get_all_campaign_metadata()
-        db_campaigns = db.get_campaigns()
-        db_ids = {c["id"] for c in db_campaigns}
-        
-        for fc in file_campaigns:
-            if fc["id"] not in db_ids:
-                print(f"Restoring orphaned campaign: {fc['name']} ({fc['id']})")
-                # Create a minimal valid campaign entry for the DB
-                restored_campaign = {
-                    "id": fc["id"],
-                    "name": fc["name"],
-                    "status": "Active",
-                    "budget": 50000, # Default assumption
-                    "spent": 0, # Default to 0 instead of random
-                    "objective": "Sales",
-                    "platforms": fc["platforms"],
-                    "strategy": {"strategy": "Restored from platform data", "tactics": []},
-                    "recommendation": {},
-                    "roi_forecast": {"projected_roi": 0, "confidence": "Low"},
-                    "timeline": {"duration_days": 30, "start_date": "2025-01-01"},
-                    "broadcast_log": {"restored": True}
-                }
-                db.add_campaign(restored_campaign)
+        with self._sync_lock:
+            for p in SYNCED_PLATFORMS:
+                self._file_index[p] = self._read_platform_index(p)
+            file_campaigns = PlatformAPI.get_all_campaign_metadata()
+            db_ids = db.get_existing_campaign_ids([fc["id"] for fc in file_campaigns])
+            
+            for fc in file_campaigns:
+                if fc["id"] not in db_ids:
+                    self._restore_campaign(fc["id"], fc["name"], fc["platforms"])
+
+    def start_watching(self):
+        """Keeps the DB in sync with out-of-band platform file edits without scanning on reads."""
+        if self.watcher is None:
+            self.watcher = DirectoryWatcher(
+                platforms_module.DATA_DIR, self._on_platform_file_changed,
+                include=lambda name: name.replace(".json", "") in SYNCED_PLATFORMS and name.endswith(".json"),
+                mode=os.getenv("PLATFORM_WATCHER", "auto"),
+                poll_interval=float(os.getenv("PLATFORM_WATCH_INTERVAL", "2.0"))
+            )
+        self.watcher.start()
+
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def _on_platform_file_changed(self, filename: str):
+        if PlatformAPI.is_own_write(filename):
+            return
+        platform = filename.replace(".json", "")
+        restored = self.sync_platform_file(platform)
+        print(f"External change to {filename}; restored {len(restored)} campaign(s)")
+        # Dashboards and caches only hear about PlatformAPI writes, so announce the external edit
+        bus.publish("platform_data", platform=platform, campaign_ids=None)
+
+    def sync_platform_file(self, platform: str) -> List[str]:
+        """Incremental sync for one platform file: only campaigns new to that file are checked against the DB."""
+        with self._sync_lock:
+            current = self._read_platform_index(platform)
+            previous = self._file_index.get(platform, {})
+            self._file_index[platform] = current
+            added = [c_id for c_id in current if c_id not in previous]
+            if not added:
+                return []
+            db_ids = db.get_existing_campaign_ids(added)
+            restored = []
+            for c_id in added:
+                if c_id not in db_ids:
+                    platforms = [p for p in SYNCED_PLATFORMS if c_id in self._file_index.get(p, {})]
+                    self._restore_campaign(c_id, current[c_id], platforms)
+                    restored.append(c_id)
+            return restored
+
+    def _read_platform_index(self, platform: str) -> Dict[str, str]:
+        data = PlatformAPI._read_json(f"{platform}.json")
+        return {c_id: c_data.get("name", "Unknown") for c_id, c_data in data.get("campaigns", {}).items()}
+
+    def _restore_campaign(self, campaign_id: str, name: str, platforms: List[str]):
+        print(f"Restoring orphaned campaign: {name} ({campaign_id})")
+        # Create a minimal valid campaign entry for the DB
+        restored_campaign = {
+            "id": campaign_id,
+            "name": name,
+            "status": "Active",
+            "budget": 50000, # Default assumption
+            "spent": 0, # Default to 0 instead of random
+            "objective": "Sales",
+            "platforms": platforms,
+            "strategy": {"strategy": "Restored from platform data", "tactics": []},
+            "recommendation": {},
+            "roi_forecast": {"projected_roi": 0, "confidence": "Low"},
+            "timeline": {"duration_days": 30, "start_date": "2025-01-01"},
+            "broadcast_log": {"restored": True}
+        }
+        db.add_campaign(restored_campaign)
 
     def create_campaign(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
         # Delegate orchestrating logic to the agent
@@ -42,6 +119,15 @@ class CampaignService:
         db.add_campaign(new_campaign)
         return new_campaign
 
+    def enrich_imported_campaigns(self, campaign_ids: List[str]) -> Dict[str, Any]:
+        """Deferred enrichment for bulk imports: runs the agent pipeline and stores its outputs."""
+        enriched = []
+        for campaign in db.get_campaigns_by_ids(campaign_ids):
+            outputs = self.orchestrator.plan_campaign(campaign)["outputs"]
+            db.update_campaign(campaign["id"], outputs)
+            enriched.append(campaign["id"])
+        return {"enriched": len(enriched), "campaign_ids": enriched}
+
     def update_campaign(self, campaign_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Updates campaign details."""
         # Optional: Add validation logic here using agents if needed
@@ -54,26 +140,88 @@ class CampaignService:
         return next((c for c in campaigns if c["id"] == campaign_id), {})
 
     def get_all_campaigns(self) -> List[Dict[str, Any]]:
-        # Re-sync on read to ensure fresh state if files changed externally
-        self.ensure_campaigns_synced()
+        # External file edits are synced by the platform file watcher (see start_watching)
         campaigns = db.get_campaigns()
         
-        # Enrich campaigns with real platform data
-        enriched_campaigns = []
-        for campaign in campaigns:
-            enriched_campaign = self.enrich_campaign_with_platform_data(campaign)
-            enriched_campaigns.append(enriched_campaign)
-        
-        return enriched_campaigns
+        # Enrich campaigns with real platform data, from one scan of the platform files
+        rollups = self.get_platform_rollups()
+        return [self._apply_rollup(campaign, rollups.get(campaign["id"])) for campaign in campaigns]
+
+    def list_campaigns(self, status: str = None, objective: str = None, platform: str = None, search: str = None,
+                       sort: str = "created_at", order: str = "desc", limit: int = 50, cursor: str = None,
+                       fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        A keyset-paginated page of the campaign list. Filters, ordering and the sparse fieldset are
+        pushed down into SQLite; platform enrichment only runs when its fields were requested.
+        Raises ValueError for unknown sort keys, fields or a malformed cursor.
+        """
+        if sort not in CAMPAIGN_SORTS:
+            raise ValueError(f"Unknown sort '{sort}'. Valid: {', '.join(CAMPAIGN_SORTS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if fields is not None:
+            unknown = [f for f in fields if f not in CAMPAIGN_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}. Valid: {', '.join(CAMPAIGN_COLUMNS)}")
+        after = self._decode_cursor(cursor, sort, order) if cursor else None
+
+        filters = {"status": status, "objective": objective, "platform": platform, "search": search}
+        rows = db.query_campaigns(**filters, sort=sort, descending=(order == "desc"), limit=limit + 1,
+                                  after=after, columns=fields)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = self._encode_cursor(rows[-1]["sort_key"], rows[-1]["id"], sort, order) if has_more else None
+
+        enrich = fields is None or "roi_forecast" in fields or "timeline" in fields
+        rollups = self.get_platform_rollups() if enrich else {}
+        items = []
+        for row in rows:
+            del row["sort_key"]
+            if enrich:
+                self._apply_rollup(row, rollups.get(row["id"]))
+            if fields is not None:
+                row = {k: v for k, v in row.items() if k in fields or k == "id"}
+            items.append(row)
+
+        return {"items": items, "total": db.count_campaigns(**filters), "limit": limit, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _encode_cursor(sort_value: Any, campaign_id: str, sort: str, order: str) -> str:
+        raw = json.dumps([sort, order, sort_value, campaign_id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            cursor_sort, cursor_order, sort_value, campaign_id = json.loads(raw)
+        except (ValueError, TypeError):
+            raise ValueError("Malformed cursor")
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise ValueError("Cursor was issued for a different sort order")
+        return sort_value, campaign_id
+
+    def get_platform_rollups(self) -> Dict[str, Dict[str, Any]]:
+        """Forecast/schedule rollups for every campaign, rebuilt only after platform data changes."""
+        with self._rollup_lock:
+            if self._rollups is None or self._rollups_version != self._platform_data_version:
+                version = self._platform_data_version
+                index = PlatformAPI.get_platforms_data_index()
+                self._rollups = {c_id: self._rollup(platforms_data) for c_id, platforms_data in index.items()}
+                self._rollups_version = version
+            return self._rollups
+
+    def _on_platform_data(self, **_):
+        # Lock-free so writers never wait on an in-progress rebuild; that rebuild is simply redone next read
+        self._platform_data_version = next(self._data_versions)
 
     def enrich_campaign_with_platform_data(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
         """Enriches campaign with real data from platform files."""
-        campaign_id = campaign["id"]
-        platforms_data = PlatformAPI.get_all_platforms_data(campaign_id)
-        
-        if not platforms_data:
-            return campaign
-        
+        platforms_data = PlatformAPI.get_all_platforms_data(campaign["id"])
+        return self._apply_rollup(campaign, self._rollup(platforms_data) if platforms_data else None)
+
+    @staticmethod
+    def _rollup(platforms_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         # Aggregate forecast data from all platforms
         total_projected_conversions = 0
         projected_roi_sum = 0
@@ -98,61 +246,143 @@ class CampaignService:
                 duration_days = max(duration_days, schedule.get("duration_days", 0))
         
         # Calculate aggregated forecast
+        roi_forecast = None
         if platform_count > 0:
             avg_projected_roi = round(projected_roi_sum / platform_count, 1)
             avg_confidence = round(sum(confidence_scores) / len(confidence_scores)) if confidence_scores else 0
             
-            campaign["roi_forecast"] = {
+            roi_forecast = {
                 "projected_roi": avg_projected_roi,
                 "projected_conversions": total_projected_conversions,
                 "confidence_score": f"{avg_confidence}%"
             }
+        return {"roi_forecast": roi_forecast, "duration_days": duration_days}
+
+    @staticmethod
+    def _apply_rollup(campaign: Dict[str, Any], rollup: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not rollup:
+            return campaign
+        if rollup["roi_forecast"] is not None:
+            # Copied so callers mutating the response cannot corrupt the cached rollup
+            campaign["roi_forecast"] = dict(rollup["roi_forecast"])
         
         # Update timeline with real duration
-        if duration_days > 0:
+        if rollup["duration_days"] > 0:
             if "timeline" not in campaign:
                 campaign["timeline"] = {}
-            campaign["timeline"]["duration_days"] = duration_days
+            campaign["timeline"]["duration_days"] = rollup["duration_days"]
         
         return campaign
 
     def update_status(self, campaign_id: str, action: str) -> Dict[str, Any]:
-        campaigns = db.get_campaigns()
-        campaign = next((c for c in campaigns if c["id"] == campaign_id), None)
+        """
+        Applies a lifecycle action from the local transition table (raises InvalidTransition).
+        The AI confirmation comes from the per-transition cache or is attached later by a job.
+        """
+        campaign = next(iter(db.get_campaigns_by_ids([campaign_id])), None)
         if not campaign:
             return {"error": "Campaign not found"}
-        
-        # Direct status mapping for immediate response
-        status_map = {
-            'Launch': 'Active',
-            'Pause': 'Paused', 
-            'Resume': 'Active'
-        }
-        new_status = status_map.get(action, campaign["status"])
-        
-        # Update in database
-        db.update_campaign_status(campaign_id, new_status)
-        
-        return {
-            "status": new_status,
-            "message": f"Campaign {action.lower()}ed successfully"
-        }
+        action, new_status = resolve_transition(campaign["status"], action)
+        return self._apply_transitions([(campaign, action, new_status)])[0]
+
+    def _apply_transitions(self, planned: List[tuple]) -> List[Dict[str, Any]]:
+        """Applies (campaign, action, new_status) triples in one transaction; returns a result per triple."""
+        transition_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        results, changes, pending = [], [], {}
+        for campaign, action, new_status in planned:
+            previous = campaign["status"]
+            result = {"id": campaign["id"], "status": new_status, "previous_status": previous,
+                      "changed": new_status != previous, "message": f"Campaign {action.lower().rstrip('e')}ed successfully"}
+            results.append(result)
+            if not result["changed"]:
+                result["confirmation"] = "unchanged"
+                continue
+            confirmation = self._confirmations.get((action, previous, new_status))
+            result["ai_confirmation"] = confirmation
+            result["confirmation"] = "cached" if confirmation else "pending"
+            changes.append({"id": campaign["id"], "from": previous, "to": new_status, "lifecycle": {
+                "transition_id": transition_id, "action": action, "from": previous, "to": new_status,
+                "at": now, "ai_confirmation": confirmation, "confirmation": result["confirmation"]
+            }})
+            if confirmation is None:
+                pending.setdefault((action, previous, new_status), []).append(campaign["id"])
+
+        applied = db.apply_status_transitions(changes)
+        lost = {c["id"] for c, ok in zip(changes, applied) if not ok}
+        for result in results:
+            if result["id"] in lost:
+                # Another writer moved the campaign first; nothing was written for it
+                result.update({"status": result["previous_status"], "changed": False, "confirmation": None,
+                               "error": "Campaign status changed concurrently; retry", "code": 409})
+                result.pop("ai_confirmation", None)
+
+        for (action, previous, new_status), ids in pending.items():
+            ids = [c_id for c_id in ids if c_id not in lost]
+            if not ids:
+                continue
+            try:
+                job_service.submit("confirm_transition", {"transition_id": transition_id, "action": action,
+                                                          "from": previous, "to": new_status, "campaign_ids": ids})
+            except ValueError as e:
+                print(f"Transition confirmation not queued: {e}")
+        return results
+
+    def confirm_transition(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Job handler: one LLM confirmation per (action, from, to), attached to every campaign in the payload."""
+        key = (payload["action"], payload["from"], payload["to"])
+        if key not in self._confirmations:
+            result = self.orchestrator.confirm_transition(*key)
+            if "error" not in result and result.get("ai_confirmation"):
+                self._confirmations[key] = result["ai_confirmation"]
+        message, state = self._confirmations.get(key), "confirmed"
+        if message is None:
+            # LLM unavailable: record a deterministic confirmation instead of leaving it pending forever
+            message, state = f"{payload['action']} applied: {payload['from']} -> {payload['to']}.", "local"
+        db.set_lifecycle_confirmations(payload["transition_id"], {c_id: message for c_id in payload["campaign_ids"]}, state)
+        return {"confirmed": len(payload["campaign_ids"]), "confirmation": state}
+
+    def bulk_update_status(self, campaign_ids: List[str], action: str) -> Dict[str, Any]:
+        """Applies one lifecycle action to many campaigns in a single transaction, with a result per id."""
+        campaigns = {c["id"]: c for c in db.get_campaigns_by_ids(campaign_ids)}
+        results: Dict[str, Dict[str, Any]] = {}
+        planned = []
+        for c_id in dict.fromkeys(campaign_ids):
+            campaign = campaigns.get(c_id)
+            if campaign is None:
+                results[c_id] = {"id": c_id, "error": "Campaign not found", "code": 404}
+                continue
+            try:
+                planned.append((campaign, *resolve_transition(campaign["status"], action)))
+            except InvalidTransition as e:
+                results[c_id] = {"id": c_id, "status": campaign["status"], "error": str(e),
+                                 "code": 400 if e.unknown_action else 409}
+        for result in self._apply_transitions(planned):
+            results[result["id"]] = result
+        ordered = [results[c_id] for c_id in dict.fromkeys(campaign_ids)]
+        return {"results": ordered, "summary": {
+            "requested": len(ordered),
+            "changed": sum(1 for r in ordered if r.get("changed")),
+            "unchanged": sum(1 for r in ordered if "error" not in r and not r["changed"]),
+            "failed": sum(1 for r in ordered if "error" in r)
+        }}
 
     def delete_campaign(self, campaign_id: str):
-        # 1. Get campaign to know which platforms to clean up
-        campaigns = db.get_campaigns()
-        campaign = next((c for c in campaigns if c["id"] == campaign_id), None)
-        
-        if campaign:
-            platforms = campaign.get("platforms", [])
-            # Also check Email if it was added dynamically
-            all_platforms = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
-            
-            # 2. Delete from platform files
-            for p in all_platforms:
-                PlatformAPI.delete_campaign_from_platform(campaign_id, p)
-                
-        # 3. Delete from DB
-        return db.delete_campaign(campaign_id)
+        return bool(self.bulk_delete([campaign_id])["summary"]["deleted"])
+
+    def bulk_delete(self, campaign_ids: List[str]) -> Dict[str, Any]:
+        """Deletes many campaigns: one SQLite transaction and at most one rewrite per platform registry."""
+        ids = list(dict.fromkeys(campaign_ids))
+        existing = db.get_existing_campaign_ids(ids)
+        targets = [c_id for c_id in ids if c_id in existing]
+        if targets:
+            # Registries are checked for every known platform, as Email may have been added dynamically
+            for p in SYNCED_PLATFORMS:
+                PlatformAPI.delete_campaigns_from_platform(targets, p)
+        deleted = db.delete_campaigns(targets) if targets else set()
+        results = [{"id": c_id, "deleted": True} if c_id in deleted else {"id": c_id, "error": "Campaign not found", "code": 404}
+                   for c_id in ids]
+        return {"results": results, "summary": {"requested": len(ids), "deleted": len(deleted), "failed": len(ids) - len(deleted)}}
+
 
 campaign_service = CampaignService()
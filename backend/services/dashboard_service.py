@@ -1,22 +1,68 @@
 from typing import Dict, Any, List
 import random
-import math
-from datetime import datetime, timedelta
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import numpy as np
 from database import db
+from events import bus
 from agents.dash import PerformanceNexusAgent
 from agents.strategy import StrategyAgent
 from platforms import PlatformAPI
 
+DASHBOARD_PLATFORMS = ["Email", "Facebook", "Google Ads", "Instagram", "Twitter"]
+TREND_COUNTERS = ["impressions", "clicks", "conversions"]
+TRENDS_CACHE_SIZE = 128
+SUMMARY_SIZE = 5
+
+# Ranking keys over merged per-campaign totals (see DashboardService._campaign_totals)
+LEADERBOARD_METRICS = {
+    "roi": lambda c: c["total_revenue"] / c["total_cost"] if c["total_cost"] > 0 else 0,
+    "spend": lambda c: c["total_cost"],
+    "revenue": lambda c: c["total_revenue"],
+    "conversions": lambda c: c["conversions"],
+}
+
+def _scope_seed(scope: str) -> np.uint64:
+    return np.uint64(int.from_bytes(hashlib.sha256(scope.encode()).digest()[:8], "little"))
+
+
+def _hash_uniform(seed: np.uint64, counters: np.ndarray) -> np.ndarray:
+    """splitmix64 of (seed + counter), mapped to [0, 1); a stateless, vectorized stand-in for random.uniform."""
+    with np.errstate(over="ignore"):
+        z = seed + counters.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
 class DashboardService:
     def __init__(self):
         self.nexus = PerformanceNexusAgent()
         self.strategy_agent = StrategyAgent()
+        # Trend series cached per (scope, granularity, range) until new metric snapshots arrive
+        self._trends_cache = OrderedDict()
+        self._trends_lock = threading.Lock()
+        self._metrics_version = 0
+        bus.subscribe("metrics", self._on_metrics_logged)
+        self._trajectory_cache = OrderedDict()
+        self._trajectory_lock = threading.Lock()
 
-    def get_stats(self, campaign_id: str = None) -> Dict[str, Any]:
-        campaigns = db.get_campaigns()
-        
+    def _on_metrics_logged(self, **_):
+        with self._trends_lock:
+            self._metrics_version += 1
+
+    def get_stats(self, campaign_id: str = None, aggregate: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Dashboard KPIs for one campaign, or across every platform file for 'all'.
+        A precomputed `aggregate` (see aggregate_platform_files) skips re-reading the files.
+        """
         if campaign_id and campaign_id != 'all':
             # Filter for specific campaign
+            campaigns = db.get_campaigns()
             campaign = next((c for c in campaigns if c["id"] == campaign_id), None)
             if not campaign:
                 return {
@@ -86,131 +132,17 @@ class DashboardService:
                 "nexus_insight": nexus_insight
             }
         else:
-            # Global Aggregated Stats for ALL Files
-            platforms = ["Email", "Facebook", "Google Ads", "Instagram", "Twitter"]
-            
-            global_spend = 0
-            global_revenue = 0
-            global_conversions = 0
-            global_impressions = 0
-            global_clicks = 0
-            
-            all_channels_map = {}
-            campaign_summary = [] # Ideally we'd scan all campaigns for this table too, but for top metrics use file aggregates
-            
-            # 1. Calculate Grand Totals from Files
-            for p_name in platforms:
-                # Use the aggregate method which sums EVERYTHING in the file
-                p_stats = PlatformAPI.get_platform_aggregate_stats(p_name)
-                metrics = p_stats["metrics"]
-                
-                # Careful: metrics costs are totals for that platform
-                global_spend += metrics.get("cost", 0)
-                # Revenue = cost * roi (back-calculated or we need revenue explicitly? 
-                # Platforms.py doesn't return revenue explicitly in aggregate, only roi.
-                # Let's derive revenue from cost * roi for now as per previous logic.
-                # Wait, average ROI * total Cost isn't exactly Sum(Cost*ROI).
-                # But PlatformAPI aggregate ROI is avg_roi.
-                # Let's stick to the previous loop logic but iterate FILES instead of DB campaigns
-                # actually, let's use get_all_campaigns_in_platform to be precise!
-                
-            # RESET for precise calculation loop
-            global_spend = 0
-            global_revenue = 0
-            global_conversions = 0
-            global_impressions = 0
-            global_clicks = 0
-            campaign_map = {}
-
-            for p_name in platforms:
-                campaigns_in_file = PlatformAPI.get_all_campaigns_in_platform(p_name)
-                
-                # Channel Stats Accumulator
-                p_spend = 0
-                p_conversions = 0
-                p_roi_sum = 0
-                p_count = 0
-                
-                for c in campaigns_in_file:
-                    m = c["metrics"]
-                    cost = m.get("cost", 0)
-                    roi = m.get("roi", 0)
-                    
-                    global_spend += cost
-                    global_revenue += cost * roi
-                    global_conversions += m.get("conversions", 0)
-                    global_impressions += m.get("impressions", 0)
-                    global_clicks += m.get("clicks", 0)
-                    
-                    p_spend += cost
-                    p_conversions += m.get("conversions", 0)
-                    p_roi_sum += roi
-                    p_count += 1
-                    
-                    # Deduplicate / Aggregate Campaign Summary
-                    c_id = c["id"]
-                    if c_id not in campaign_map:
-                        campaign_map[c_id] = {
-                            "id": c_id,
-                            "name": c["name"],
-                            "status": "Active",
-                            "total_cost": cost,
-                            "total_revenue": cost * roi,
-                            "progress": 60,
-                            "platforms": [p_name]
-                        }
-                    else:
-                        campaign_map[c_id]["total_cost"] += cost
-                        campaign_map[c_id]["total_revenue"] += (cost * roi)
-                        campaign_map[c_id]["platforms"].append(p_name)
-
-                if p_count > 0:
-                     all_channels_map[p_name] = {
-                        "spend": p_spend,
-                        "conversions": p_conversions,
-                        "roi_sum": p_roi_sum,
-                        "count": p_count
-                     }
-
-            # Convert map to list
-            campaign_summary = []
-            for c_id, data in campaign_map.items():
-                # Calculate aggregated ROI
-                avg_camp_roi = (data["total_revenue"] / data["total_cost"]) if data["total_cost"] > 0 else 0
-                
-                # Format platform string
-                unique_platforms = list(set(data["platforms"]))
-                platform_str = "Multi-Channel (" + ", ".join(unique_platforms) + ")" if len(unique_platforms) > 1 else unique_platforms[0]
-                
-                campaign_summary.append({
-                    "id": data["id"],
-                    "name": data["name"],
-                    "status": data["status"],
-                    "budget": data["total_cost"],
-                    "roi": round(avg_camp_roi, 2),
-                    "progress": data["progress"],
-                    "platform": platform_str
-                })
-            
-            total_campaigns_count = len(campaign_summary)
-
-            channels = []
-            colors = ["bg-indigo-500", "bg-blue-500", "bg-teal-500", "bg-emerald-500", "bg-amber-500"]
-            for i, (name, data) in enumerate(all_channels_map.items()):
-                # Calculate average CPC and CTR for this platform
-                platform_aggregate = PlatformAPI.get_platform_aggregate_stats(name)
-                avg_ctr = platform_aggregate["metrics"].get("ctr", 0)
-                avg_cpc = platform_aggregate["metrics"].get("cpc", 0)
-                
-                channels.append({
-                    "name": name,
-                    "roi": round(data["roi_sum"] / data["count"], 2) if data["count"] > 0 else 0,
-                    "spend": data["spend"],
-                    "conversions": data["conversions"],
-                    "ctr": avg_ctr,
-                    "cpc": avg_cpc,
-                    "color": colors[i % len(colors)]
-                })
+            # Global Aggregated Stats for ALL Files (one read per platform file)
+            agg = aggregate or self.aggregate_platform_files()
+            totals = agg["totals"]
+            global_spend = totals["spend"]
+            global_revenue = totals["revenue"]
+            global_conversions = totals["conversions"]
+            global_impressions = totals["impressions"]
+            global_clicks = totals["clicks"]
+            channels = agg["channels"]
+            campaign_summary = agg["campaign_summary"]
+            total_campaigns_count = agg["campaign_count"]
 
             avg_roi = (global_revenue / global_spend) if global_spend > 0 else 0
             avg_ctr = (global_clicks / global_impressions * 100) if global_impressions > 0 else 0
@@ -237,122 +169,244 @@ class DashboardService:
                 "avg_cpm": round(avg_cpm, 2),
                 "avg_conversion_rate": round(avg_conversion_rate, 2),
                 "channels": channels,
-                "campaign_summary": campaign_summary[:5], # Last 5 campaigns
+                "campaign_summary": campaign_summary, # Top campaigns by revenue
                 "nexus_insight": nexus_insight
             }
 
-    def get_performance_trends(self, campaign_id: str = None, days: int = 30) -> Dict[str, Any]:
-        
-        # 1. Get Baseline Totals from Real Data
-        stats = self.get_stats(campaign_id)
-        
-        # Baselines (Daily Average)
-        total_rev = stats.get("total_revenue", 0)
-        total_imp = stats.get("total_impressions", 0)
-        total_clicks = stats.get("channels", []) # We need to aggregate clicks from channels if not in top level
-        
-        # stats['channels'] has the click data
-        total_clicks_count = sum(c.get("clicks", 0) for c in stats.get("channels", []))
-        if total_clicks_count == 0: 
-             # Fallback if channels structure is different or empty, try to calc from total_spend / avg cpc or similar?
-             # Actually, let's just grab it from the PlatformAPI aggregation again if needed, 
-             # but stats calculation above in get_stats doesn't seem to sum clicks explicitly in the top level dict.
-             # Let's check get_stats again. It calculates total_conversions and impressions. Clicks are missing in top level return.
-             # We should probably fix get_stats to return total_clicks too, but for now let's re-sum here or just trust the loop below.
-             pass
-
-        # Re-calc baseline from stats or re-fetch to be safe/clean
-        # Actually, let's just use the stats we have.
-        # stats['channels'] contains 'roi', 'spend', 'conversions', 'ctr', 'cpc'. 
-        # Clicks = spend / cpc (approx) or just sum from the raw data if we had it.
-        # Wait, get_stats loop:
-        # for i, p in enumerate(platforms_data):
-        #    ... "metrics" has clicks.
-        #    channels.append({ ... "metrics".get("ctr") ... })
-        # It doesn't strictly return total clicks.
-        
-        # Let's just re-fetch platform data to be accurate for trends
-        if campaign_id and campaign_id != 'all':
-            platforms_data = PlatformAPI.get_all_platforms_data(campaign_id)
-        else:
-            campaigns = db.get_campaigns()
-            platforms_data = []
-            for c in campaigns:
-                platforms_data.extend(PlatformAPI.get_all_platforms_data(c["id"]))
+    def aggregate_platform_files(self, platforms: List[str] = None) -> Dict[str, Any]:
+        """
+        Single pass over every platform file: global totals, per-channel stats
+        (CTR/CPC from summed clicks and impressions) and the top-campaign summary.
+        """
+        platforms = platforms or DASHBOARD_PLATFORMS
+        return self.combine_platform_aggregates([self.aggregate_platform(p) for p in platforms])
 
-        grand_total_impressions = sum(p["metrics"].get("impressions", 0) for p in platforms_data)
-        grand_total_clicks = sum(p["metrics"].get("clicks", 0) for p in platforms_data)
-        grand_total_conversions = sum(p["metrics"].get("conversions", 0) for p in platforms_data)
-        
-        # Calculate daily averages
-        avg_imp = grand_total_impressions / 30 if grand_total_impressions else 1000
-        avg_click = grand_total_clicks / 30 if grand_total_clicks else 50
-        avg_conv = grand_total_conversions / 30 if grand_total_conversions else 10
-
-        trends = []
-        now = datetime.now()
-
-        # Generate smooth curve with some noise
-        for i in range(days):
-            date = now - timedelta(days=(days - 1 - i))
-            date_str = date.strftime("%m/%d/%Y") # Frontend likely wants a standard date format
-            
-            # Create a wave pattern + random noise
-            # specific phase shift for each metric to look organic (not all going up/down exactly together)
-            
-            # Impressions: High volume, sine wave
-            phase_imp = (i / 30) * 3.14159 * 2 
-            # Use math.sin for cleaner calculation
-            imp_factor = 1.0 + 0.3 * math.sin((i / 10.0)) + random.uniform(-0.1, 0.1)
-            
-            # Clicks: Correlated with impressions but distinct
-            click_factor = imp_factor * (1.0 + random.uniform(-0.15, 0.15))
-            
-            # Conversions: Lagged or slightly different
-            conv_factor = imp_factor * (1.0 + random.uniform(-0.2, 0.2))
-
-            trends.append({
-                "date": date_str,
-                "impressions": int(avg_imp * imp_factor),
-                "clicks": int(avg_click * click_factor),
-                "conversions": int(avg_conv * conv_factor)
-            })
+    def aggregate_platform(self, p_name: str) -> Dict[str, Any]:
+        """Partial aggregate of one platform file; None when the file has no campaigns."""
+        campaigns_in_file = PlatformAPI.get_all_campaigns_in_platform(p_name)
+        if not campaigns_in_file:
+            return None
+
+        totals = {"spend": 0, "revenue": 0, "conversions": 0, "impressions": 0, "clicks": 0}
+        p_roi_sum = 0
+        campaigns = []
+
+        for c in campaigns_in_file:
+            m = c["metrics"]
+            cost = m.get("cost", 0)
+            roi = m.get("roi", 0)
+
+            totals["spend"] += cost
+            totals["revenue"] += cost * roi
+            totals["conversions"] += m.get("conversions", 0)
+            totals["impressions"] += m.get("impressions", 0)
+            totals["clicks"] += m.get("clicks", 0)
+            p_roi_sum += roi
+            campaigns.append((c["id"], c["name"], cost, cost * roi, m.get("conversions", 0)))
+
+        p_ctr = (totals["clicks"] / totals["impressions"] * 100) if totals["impressions"] > 0 else 0
+        p_cpc = (totals["spend"] / totals["clicks"]) if totals["clicks"] > 0 else 0
+        return {
+            "platform": p_name,
+            "totals": totals,
+            "channel": {
+                "name": p_name,
+                "roi": round(p_roi_sum / len(campaigns_in_file), 2),
+                "spend": totals["spend"],
+                "conversions": totals["conversions"],
+                "ctr": round(p_ctr, 2),
+                "cpc": round(p_cpc, 2)
+            },
+            "campaigns": campaigns
+        }
+
+    def combine_platform_aggregates(self, partials: List[Dict[str, Any]], top_k: int = SUMMARY_SIZE) -> Dict[str, Any]:
+        """
+        Merges per-platform partials (in platform order) without touching the files again.
+        The campaign summary holds only the `top_k` campaigns by revenue.
+        """
+        totals = {"spend": 0, "revenue": 0, "conversions": 0, "impressions": 0, "clicks": 0}
+        channels = []
+        colors = ["bg-indigo-500", "bg-blue-500", "bg-teal-500", "bg-emerald-500", "bg-amber-500"]
+
+        for partial in partials:
+            if not partial:
+                continue
+            for key, value in partial["totals"].items():
+                totals[key] += value
+            channels.append({**partial["channel"], "color": colors[len(channels) % len(colors)]})
+
+        campaign_map = self._campaign_totals(partials)
+        campaign_summary = [self._summary_entry(data) for data in self._top(campaign_map.values(), "revenue", top_k)]
+        return {
+            "totals": totals,
+            "channels": channels,
+            "campaign_count": len(campaign_map),
+            "campaign_summary": campaign_summary
+        }
+
+    def top_campaigns(self, partials: List[Dict[str, Any]], metric: str = "roi", k: int = 10, platform: str = None) -> List[Dict[str, Any]]:
+        """Top `k` campaigns by `metric` (one of LEADERBOARD_METRICS), optionally within one platform."""
+        if platform:
+            partials = [p for p in partials if p and p["platform"] == platform]
+        ranked = self._top(self._campaign_totals(partials).values(), metric, k)
+        return [
+            {"rank": i + 1, **self._summary_entry(data), "spend": data["total_cost"], "revenue": data["total_revenue"],
+             "conversions": data["conversions"], "platforms": list(dict.fromkeys(data["platforms"]))}
+            for i, data in enumerate(ranked)
+        ]
+
+    def _campaign_totals(self, partials: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Deduplicate / Aggregate campaigns that run on several platforms
+        campaign_map = {}
+        for partial in partials:
+            if not partial:
+                continue
+            for c_id, name, cost, revenue, conversions in partial["campaigns"]:
+                entry = campaign_map.get(c_id)
+                if entry is None:
+                    campaign_map[c_id] = {
+                        "id": c_id,
+                        "name": name,
+                        "total_cost": cost,
+                        "total_revenue": revenue,
+                        "conversions": conversions,
+                        "platforms": [partial["platform"]]
+                    }
+                else:
+                    entry["total_cost"] += cost
+                    entry["total_revenue"] += revenue
+                    entry["conversions"] += conversions
+                    entry["platforms"].append(partial["platform"])
+        return campaign_map
+
+    def _top(self, campaigns, metric: str, k: int) -> List[Dict[str, Any]]:
+        """O(n log k) selection; ties keep first-seen (platform file) order."""
+        return heapq.nlargest(k, campaigns, key=LEADERBOARD_METRICS[metric])
+
+    def _summary_entry(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        avg_camp_roi = (data["total_revenue"] / data["total_cost"]) if data["total_cost"] > 0 else 0
+        unique_platforms = list(set(data["platforms"]))
+        platform_str = "Multi-Channel (" + ", ".join(unique_platforms) + ")" if len(unique_platforms) > 1 else unique_platforms[0]
+        return {
+            "id": data["id"],
+            "name": data["name"],
+            "status": "Active",
+            "budget": data["total_cost"],
+            "roi": round(avg_camp_roi, 2),
+            "progress": 60,
+            "platform": platform_str
+        }
+
+    def get_performance_trends(self, campaign_id: str = None, days: int = 30, granularity: str = "day") -> List[Dict[str, Any]]:
+        """
+        Impressions/clicks/conversions per day (or hour) over the last `days`, taken from the
+        metric snapshots stored in SQLite. Counters are cumulative, so each bucket holds
+        the growth between consecutive snapshots. Buckets with no activity are zero-filled.
+        """
+        scope = campaign_id if campaign_id and campaign_id != 'all' else None
+        unit = "h" if granularity == "hour" else "D"
+        end = np.datetime64(datetime.now(), unit)
+        buckets = days * 24 if unit == "h" else days
+        start = end - (buckets - 1)
+
+        key = (scope, unit, int(start.astype(np.int64)), buckets)
+        with self._trends_lock:
+            cached = self._trends_cache.get(key)
+            if cached and cached[0] == self._metrics_version:
+                return cached[1]
+            version = self._metrics_version
 
+        rows = db.get_metric_history(str(start.astype("datetime64[s]")), scope, TREND_COUNTERS)
+        series = self._bucket_counter_deltas(rows, start, buckets, unit)
+
+        label_format = "%m/%d/%Y %H:00" if unit == "h" else "%m/%d/%Y"
+        labels = (start + np.arange(buckets)).astype("datetime64[s]").astype(datetime)
+        trends = [
+            {"date": label.strftime(label_format), **{name: int(series[name][i]) for name in TREND_COUNTERS}}
+            for i, label in enumerate(labels)
+        ]
+
+        with self._trends_lock:
+            if version == self._metrics_version:
+                self._trends_cache[key] = (version, trends)
+                while len(self._trends_cache) > TRENDS_CACHE_SIZE:
+                    self._trends_cache.pop(next(iter(self._trends_cache)))
         return trends
 
+    def _bucket_counter_deltas(self, rows: List[Dict[str, Any]], start, buckets: int, unit: str) -> Dict[str, np.ndarray]:
+        """
+        Per-bucket sums of counter growth. `rows` are ordered by (campaign, platform, time);
+        the first row of a series that predates `start` only serves as its baseline.
+        A drop in a counter is treated as a reset, so the new value counts as growth from zero.
+        """
+        empty = {name: np.zeros(buckets, dtype=np.int64) for name in TREND_COUNTERS}
+        if not rows:
+            return empty
+
+        series_key = np.array([f"{r['campaign_id']}\x1f{r['platform']}" for r in rows])
+        stamps = np.array([r["timestamp"] for r in rows], dtype="datetime64[us]")
+        new_series = np.ones(len(rows), dtype=bool)
+        new_series[1:] = series_key[1:] != series_key[:-1]
+
+        index = (stamps.astype(f"datetime64[{unit}]") - start).astype(np.int64)
+        in_range = (index >= 0) & (index < buckets)
+
+        for name in TREND_COUNTERS:
+            values = np.array([r[name] or 0 for r in rows], dtype=np.float64)
+            previous = np.concatenate(([0.0], values[:-1]))
+            previous[new_series] = 0.0
+            delta = values - previous
+            delta = np.where(delta < 0, values, delta)
+            empty[name] = np.bincount(index[in_range], weights=delta[in_range], minlength=buckets).round().astype(np.int64)
+        return empty
+
+    def get_revenue_trajectory(self, campaign_id: str = None, days: int = 30,
+                               revenue: float = None, version: Any = None) -> List[Dict[str, Any]]:
+        """
+        Simulated daily revenue curve around the scope's real revenue baseline.
+        Noise is hashed from (scope, date), so a given day renders identically on every poll.
+        Pass `revenue`/`version` from a snapshot to skip the aggregate; results are memoized
+        per (scope, days, day, version) when a version is given.
+        """
+        scope = campaign_id if campaign_id and campaign_id != 'all' else 'all'
+        today = np.datetime64(datetime.now(), "D")
+        key = (scope, days, int(today.astype(np.int64)), version)
+        if version is not None:
+            with self._trajectory_lock:
+                cached = self._trajectory_cache.get(key)
+            if cached is not None:
+                return cached
 
-    def get_revenue_trajectory(self, campaign_id: str = None, days: int = 30) -> List[Dict[str, Any]]:
         # 1. Get Baseline from Real Data
-        stats = self.get_stats(campaign_id)
-        current_revenue = stats.get("total_revenue", 0)
-        
-        # 2. Generate Trajectory
-        trajectory = []
-        now = datetime.now()
-        
-        # Daily average base
+        current_revenue = revenue if revenue is not None else self._revenue_baseline(scope)
         daily_revenue = current_revenue / 30 if current_revenue > 0 else 1000
-        
-        for i in range(days):
-            date = now - timedelta(days=(days - 1 - i))
-            # Format as "Mon DD" e.g. "Dec 21"
-            date_str = date.strftime("%b %d")
-            
-            # Create organic growth curve
-            # Base growth + random fluctuation + sine wave for seasonality
-            growth_factor = 1.0 + (i / days) * 0.2  # 20% growth over period
-            seasonality = math.sin((i / 7) * 3.14) * 0.1 # Weekly fluctuations
-            noise = random.uniform(-0.05, 0.05)
-            
-            revenue_point = daily_revenue * (growth_factor + seasonality + noise)
-            
-            trajectory.append({
-                "name": date_str,
-                "revenue": int(max(0, revenue_point))
-            })
-            
+
+        # 2. Generate Trajectory (growth + weekly seasonality + deterministic noise)
+        i = np.arange(days, dtype=np.float64)
+        dates = today - (days - 1) + np.arange(days)
+        growth_factor = 1.0 + (i / days) * 0.2  # 20% growth over period
+        seasonality = np.sin((i / 7) * 3.14) * 0.1  # Weekly fluctuations
+        noise = _hash_uniform(_scope_seed(scope), dates.astype(np.int64)) * 0.1 - 0.05
+        revenue_points = np.maximum(0, daily_revenue * (growth_factor + seasonality + noise)).astype(np.int64)
+
+        # Format as "Mon DD" e.g. "Dec 21"
+        labels = dates.astype(datetime)
+        trajectory = [{"name": d.strftime("%b %d"), "revenue": int(r)} for d, r in zip(labels, revenue_points)]
+
+        if version is not None:
+            with self._trajectory_lock:
+                self._trajectory_cache[key] = trajectory
+                while len(self._trajectory_cache) > TRENDS_CACHE_SIZE:
+                    self._trajectory_cache.pop(next(iter(self._trajectory_cache)))
         return trajectory
 
+    def _revenue_baseline(self, scope: str) -> float:
+        if scope == 'all':
+            return self.aggregate_platform_files()["totals"]["revenue"]
+        platforms_data = PlatformAPI.get_all_platforms_data(scope)
+        return sum(p["metrics"].get("cost", 0) * p["metrics"].get("roi", 0) for p in platforms_data)
+
 
     def get_ai_insights(self, campaign_id: str = None) -> List[Dict[str, Any]]:
         # Fetch current data with AI insights
@@ -0,0 +1,153 @@
+from typing import Dict, Any, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+from datetime import datetime
+import csv
+import json
+import os
+import time
+import uuid
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from database import db
+from platforms import PlatformAPI
+from services.job_service import job_service
+
+IMPORT_PLATFORMS = ["Instagram", "Facebook", "Twitter", "Google Ads", "Email"]
+
+
+class CampaignImportRow(BaseModel):
+    name: str = Field(min_length=1, max_length=200)
+    budget: float = Field(ge=0)
+    objective: str = Field(min_length=1)
+    platforms: List[str] = Field(min_length=1)
+    status: Literal["Draft", "Active", "Paused"] = "Draft"
+    spent: float = Field(0, ge=0)
+    target_audience: Optional[Union[int, str]] = None
+
+    @field_validator("platforms", mode="before")
+    @classmethod
+    def split_platforms(cls, value):
+        # CSV cells carry platforms as "Instagram;Facebook" (or "|"-separated)
+        if isinstance(value, str):
+            value = [p.strip() for p in value.replace("|", ";").split(";") if p.strip()]
+        return value
+
+    @field_validator("platforms")
+    @classmethod
+    def known_platforms(cls, value):
+        unknown = [p for p in value if p not in IMPORT_PLATFORMS]
+        if unknown:
+            raise ValueError(f"unknown platform(s) {', '.join(unknown)}; expected {', '.join(IMPORT_PLATFORMS)}")
+        return list(dict.fromkeys(value))
+
+
+class CampaignImportService:
+    """
+    Bulk campaign import from CSV or NDJSON lines, consumed incrementally.
+    Valid rows are inserted in batched transactions; platform registries are written once per
+    platform at the end. The agent pipeline is skipped and can be deferred to the job queue.
+    """
+    def __init__(self):
+        self.batch_size = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+        self.max_reported_errors = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+    def parse(self, lines: Iterable[str], fmt: str = "csv") -> Iterator[Tuple[int, Any]]:
+        """Yields (row number, raw dict) or (row number, exception) per record; blank lines are skipped."""
+        if fmt == "ndjson":
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError("expected a JSON object")
+                    yield number, record
+                except ValueError as e:
+                    yield number, e
+        elif fmt == "csv":
+            reader = csv.DictReader(lines)
+            for record in reader:
+                if None in record:
+                    yield reader.line_num, ValueError("more fields than header columns")
+                    continue
+                # Empty cells fall back to the model defaults
+                yield reader.line_num, {k.strip(): v for k, v in record.items() if k and v not in (None, "")}
+        else:
+            raise ValueError(f"Unsupported import format '{fmt}'")
+
+    def import_lines(self, lines: Iterable[str], fmt: str = "csv", enrich: bool = False) -> Dict[str, Any]:
+        """
+        Imports every valid row and reports the invalid ones without aborting.
+        With `enrich`, one `enrich_campaigns` job per batch queues the agent pipeline.
+        """
+        started = time.perf_counter()
+        summary = {"format": fmt, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False,
+                   "enrichment_jobs": []}
+        pending_platforms: Dict[str, List[Dict[str, Any]]] = {p: [] for p in IMPORT_PLATFORMS}
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        def error(row: int, message: str):
+            summary["failed"] += 1
+            if len(summary["errors"]) < self.max_reported_errors:
+                summary["errors"].append({"row": row, "error": message})
+            else:
+                summary["errors_truncated"] = True
+
+        def flush():
+            campaigns = [c for _, c in batch]
+            try:
+                db.add_campaigns(campaigns)
+            except Exception as e:
+                for row, _ in batch:
+                    error(row, f"database insert failed: {e}")
+                batch.clear()
+                return
+            summary["imported"] += len(campaigns)
+            for c in campaigns:
+                entry = {"id": c["id"], "name": c["name"], "budget": c["budget"], "target_audience": c.pop("_target_audience")}
+                for p in c["platforms"]:
+                    pending_platforms[p].append(entry)
+            if enrich:
+                job = job_service.submit("enrich_campaigns", {"campaign_ids": [c["id"] for c in campaigns]})
+                summary["enrichment_jobs"].append(job["job_id"])
+            batch.clear()
+
+        for row, record in self.parse(lines, fmt):
+            if isinstance(record, Exception):
+                error(row, str(record))
+                continue
+            try:
+                item = CampaignImportRow(**record)
+            except ValidationError as e:
+                error(row, "; ".join(f"{'.'.join(str(l) for l in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()))
+                continue
+            batch.append((row, self._campaign(item)))
+            if len(batch) >= self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        for platform, entries in pending_platforms.items():
+            PlatformAPI.add_campaigns_to_platform(platform, entries)
+
+        summary["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return summary
+
+    @staticmethod
+    def _campaign(item: CampaignImportRow) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "name": item.name,
+            "status": item.status,
+            "budget": item.budget,
+            "spent": item.spent,
+            "objective": item.objective,
+            "platforms": item.platforms,
+            "strategy": {"strategy": "Imported; agent planning pending", "tactics": []},
+            "recommendation": {},
+            "roi_forecast": {},
+            "timeline": {"duration_days": 30},
+            "broadcast_log": {"imported": True},
+            "created_at": datetime.now().isoformat(),
+            "_target_audience": str(item.target_audience) if item.target_audience is not None else "0"
+        }
+
+import_service = CampaignImportService()
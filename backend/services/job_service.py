@@ -0,0 +1,101 @@
+from typing import Dict, Any, Callable, Optional
+import os
+import threading
+import traceback
+import uuid
+from database import db
+from agents.ratelimit import llm_priority
+
+
+class JobService:
+    """
+    Durable background queue for long-running agent work.
+    Jobs are persisted in the SQLite `jobs` table, so queued work survives restarts,
+    and are executed by a pool of worker threads with retry and exponential backoff.
+    """
+    def __init__(self):
+        self.worker_count = int(os.getenv("JOB_WORKERS", "4"))
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+        self.retry_backoff = float(os.getenv("JOB_RETRY_BACKOFF", "2.0"))
+        self.lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+        self.handlers: Dict[str, Dict[str, Any]] = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any], max_attempts: int = 3):
+        """Registers the callable that executes jobs of `kind`. It receives the job payload."""
+        self.handlers[kind] = {"handler": handler, "max_attempts": max_attempts}
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = db.enqueue_job(str(uuid.uuid4()), kind, payload, self.handlers[kind]["max_attempts"])
+        self._wakeup.set()
+        return self._public_view(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = db.get_job(job_id)
+        return self._public_view(job) if job else None
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        requeued = db.requeue_stale_jobs(self.lease_seconds)
+        if requeued:
+            print(f"Requeued {requeued} stale background jobs")
+        for i in range(self.worker_count):
+            t = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _worker_loop(self):
+        worker_id = f"{os.getpid()}-{threading.current_thread().name}-{uuid.uuid4().hex[:8]}"
+        while not self._stopping.is_set():
+            job = db.claim_job(worker_id, list(self.handlers.keys()))
+            if not job:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def _execute(self, job: Dict[str, Any]):
+        handler = self.handlers[job["kind"]]["handler"]
+        try:
+            # Queued work yields LLM capacity to interactive and in-request callers
+            with llm_priority("batch"):
+                result = handler(job["payload"] or {})
+            db.complete_job(job["id"], result)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[JobService] Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {error}")
+            traceback.print_exc()
+            if job["attempts"] < job["max_attempts"]:
+                db.fail_job(job["id"], error, retry_in=self.retry_backoff * (2 ** (job["attempts"] - 1)))
+            else:
+                db.fail_job(job["id"], error)
+
+    def _public_view(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "max_attempts": job["max_attempts"],
+            "result": job["result"],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "status_url": f"/api/jobs/{job['id']}"
+        }
+
+job_service = JobService()
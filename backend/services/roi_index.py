@@ -0,0 +1,51 @@
+from typing import Dict, Any, List
+import os
+import threading
+from events import bus
+from platforms import DATA_DIR, PlatformAPI
+
+
+class PlatformROIIndex:
+    """
+    Campaigns of each platform registry ranked by ROI (highest first, ties in registry order),
+    kept in memory. A platform_data event marks only that platform stale, and its ranking is
+    rebuilt from the one registry on the next read.
+    """
+    def __init__(self):
+        self._ranked: Dict[str, List[Dict[str, Any]]] = {}
+        self._stale = set()
+        self._lock = threading.Lock()
+        bus.subscribe("platform_data", self._on_platform_data)
+
+    def ranked(self, platform: str) -> List[Dict[str, Any]]:
+        """[{id, name, roi, conversions, spend}] for the platform, best ROI first. Do not mutate."""
+        if not os.path.isfile(os.path.join(DATA_DIR, f"{platform}.json")):
+            # The name comes from the query string: platforms without a registry are never cached
+            return []
+        with self._lock:
+            if platform in self._ranked and platform not in self._stale:
+                return self._ranked[platform]
+            self._stale.discard(platform)
+        ranked = self._build(platform)
+        with self._lock:
+            # A write during the build re-marks the platform stale, so the next read rebuilds again
+            self._ranked[platform] = ranked
+        return ranked
+
+    def _on_platform_data(self, topic: str, platform: str, **_):
+        with self._lock:
+            self._stale.add(platform)
+
+    @staticmethod
+    def _build(platform: str) -> List[Dict[str, Any]]:
+        entries = [{
+            "id": c["id"],
+            "name": c["name"],
+            "roi": c["metrics"].get("roi", 0),
+            "conversions": c["metrics"].get("conversions", 0),
+            "spend": c["metrics"].get("cost", 0)
+        } for c in PlatformAPI.get_all_campaigns_in_platform(platform)]
+        # sorted() is stable with reverse=True, so equal ROIs keep their registry order
+        return sorted(entries, key=lambda x: x["roi"], reverse=True)
+
+roi_index = PlatformROIIndex()
@@ -0,0 +1,143 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import itertools
+import os
+import threading
+import time
+from events import bus
+from services.dashboard_service import dashboard_service, DASHBOARD_PLATFORMS
+
+
+class DashboardSnapshotService:
+    """
+    Materialized `get_stats` payloads per scope ('all' plus one per campaign), served from memory.
+    Writes published on the event bus mark scopes dirty; a debounced flush then rebuilds only
+    those scopes. For 'all', only the platform files that changed are re-read, and the global
+    payload is re-derived from cached per-platform partial aggregates.
+    """
+    def __init__(self, dashboard=dashboard_service):
+        self.dashboard = dashboard
+        self.debounce = float(os.getenv("DASHBOARD_SNAPSHOT_DEBOUNCE", "0.25"))
+        self.max_scopes = int(os.getenv("DASHBOARD_SNAPSHOT_MAX_SCOPES", "256"))
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._partials: Dict[str, Any] = {}
+        self._dirty_platforms = set()
+        self._dirty_scopes = set()
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        bus.subscribe("platform_data", self._on_platform_data)
+        bus.subscribe("campaigns", self._on_campaigns)
+
+    def get_stats(self, campaign_id: str = None) -> Dict[str, Any]:
+        """Latest snapshot for the scope (built synchronously on first request) plus its version."""
+        snapshot = self._snapshot(campaign_id)
+        return {**snapshot["payload"], "snapshot_version": snapshot["version"]}
+
+    def lookup(self, campaign_id: str, field: str) -> Tuple[Any, int]:
+        """A single field of the scope's snapshot and the snapshot version, without copying the payload."""
+        snapshot = self._snapshot(campaign_id)
+        return snapshot["payload"].get(field), snapshot["version"]
+
+    def leaderboard(self, metric: str = "roi", k: int = 10, platform: str = None):
+        """Top-k campaigns ranked from the cached per-platform partials (no file reads once warm)."""
+        self._snapshot('all')
+        partials = [self._partials.get(p) for p in DASHBOARD_PLATFORMS]
+        return self.dashboard.top_campaigns(partials, metric, k, platform)
+
+    def _snapshot(self, campaign_id: str = None) -> Dict[str, Any]:
+        scope = campaign_id if campaign_id and campaign_id != 'all' else 'all'
+        snapshot = self._snapshots.get(scope)
+        if snapshot is None:
+            with self._build_lock:
+                snapshot = self._snapshots.get(scope) or self._build(scope)
+        else:
+            with self._lock:
+                if scope in self._snapshots:
+                    self._snapshots.move_to_end(scope)
+        return snapshot
+
+    def invalidate(self):
+        """Drops every snapshot; the next read of each scope rebuilds it from scratch."""
+        with self._build_lock, self._lock:
+            self._snapshots.clear()
+            self._partials.clear()
+            self._dirty_platforms.clear()
+            self._dirty_scopes.clear()
+
+    def _on_platform_data(self, topic: str, platform: str, campaign_ids=None, **_):
+        with self._lock:
+            self._dirty_platforms.add(platform)
+            self._dirty_scopes.add('all')
+            if campaign_ids is None:
+                self._dirty_scopes.update(self._snapshots.keys())
+            else:
+                self._dirty_scopes.update(c for c in campaign_ids if c in self._snapshots)
+        self._schedule()
+
+    def _on_campaigns(self, topic: str, campaign_ids, op: str = "update", **_):
+        # Campaign rows only feed the per-campaign scopes (name/status); 'all' is built from files
+        with self._lock:
+            for c in campaign_ids:
+                if op == "delete":
+                    self._snapshots.pop(c, None)
+                elif c in self._snapshots:
+                    self._dirty_scopes.add(c)
+        self._schedule()
+
+    def _schedule(self):
+        with self._lock:
+            if self._timer is not None or not self._dirty_scopes:
+                return
+            self._timer = threading.Timer(self.debounce, self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        with self._build_lock:
+            with self._lock:
+                self._timer = None
+                platforms, self._dirty_platforms = self._dirty_platforms, set()
+                scopes, self._dirty_scopes = self._dirty_scopes, set()
+            try:
+                for platform in platforms:
+                    if platform in self._partials:
+                        self._partials[platform] = self.dashboard.aggregate_platform(platform)
+                rebuilt = []
+                for scope in scopes:
+                    if scope in self._snapshots:
+                        self._build(scope)
+                        rebuilt.append(scope)
+                if rebuilt:
+                    # Rebuilt payloads are new data for HTTP caching, even though no write happened now
+                    bus.publish("snapshots", scopes=rebuilt)
+            except Exception as e:
+                print(f"[DashboardSnapshotService] Rebuild failed, will retry on next write: {e}")
+                with self._lock:
+                    self._dirty_platforms.update(platforms)
+                    self._dirty_scopes.update(scopes)
+
+    def _build(self, scope: str) -> Dict[str, Any]:
+        if scope == 'all':
+            for platform in DASHBOARD_PLATFORMS:
+                if platform not in self._partials:
+                    self._partials[platform] = self.dashboard.aggregate_platform(platform)
+            aggregate = self.dashboard.combine_platform_aggregates([self._partials[p] for p in DASHBOARD_PLATFORMS])
+            payload = self.dashboard.get_stats(None, aggregate=aggregate)
+        else:
+            payload = self.dashboard.get_stats(scope)
+
+        snapshot = {"payload": payload, "version": next(self._versions), "built_at": time.time()}
+        with self._lock:
+            self._snapshots[scope] = snapshot
+            self._snapshots.move_to_end(scope)
+            while len(self._snapshots) > self.max_scopes:
+                # The global scope stays resident; evict the least recently read campaign
+                victim = next((k for k in self._snapshots if k != 'all'), None)
+                if victim is None:
+                    break
+                del self._snapshots[victim]
+        return snapshot
+
+snapshot_service = DashboardSnapshotService()
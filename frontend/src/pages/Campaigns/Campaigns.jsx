@@ -5,6 +5,7 @@ import CreateCampaignModal from '../../components/CreateCampaignModal';
 import { useNotifications } from '../../context/NotificationContext';
 
 const API_BASE_URL = '/api';
+const PAGE_SIZE = 60;
 
 const CampaignCard = ({ campaign, onAction, onViewDetail, onEdit }) => {
     const getButtonConfig = () => {
@@ -114,20 +115,35 @@ const Campaigns = () => {
     const [filterStatus, setFilterStatus] = useState('All');
     const [campaigns, setCampaigns] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [total, setTotal] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [selectedCampaign, setSelectedCampaign] = useState(null);
     const [initialModalData, setInitialModalData] = useState(null);
     const { triggerPlatformCheck } = useNotifications();
 
+    // Filtering, search and paging happen server-side; search is debounced
     useEffect(() => {
-        fetchCampaigns();
-    }, []);
+        const handle = setTimeout(() => fetchCampaigns(), searchTerm ? 250 : 0);
+        return () => clearTimeout(handle);
+    }, [searchTerm, filterStatus]);
+
+    const listParams = (cursor) => {
+        const params = { limit: PAGE_SIZE };
+        if (filterStatus !== 'All') params.status = filterStatus;
+        if (searchTerm.trim()) params.q = searchTerm.trim();
+        if (cursor) params.cursor = cursor;
+        return params;
+    };
 
     const fetchCampaigns = async () => {
         setLoading(true);
         try {
-            const response = await axios.get(`${API_BASE_URL}/campaigns`);
-            setCampaigns(response.data);
+            const response = await axios.get(`${API_BASE_URL}/campaigns`, { params: listParams() });
+            setCampaigns(response.data.items);
+            setNextCursor(response.data.next_cursor);
+            setTotal(response.data.total);
         } catch (error) {
             console.error("Error fetching campaigns:", error);
         } finally {
@@ -135,6 +151,21 @@ const Campaigns = () => {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        try {
+            const response = await axios.get(`${API_BASE_URL}/campaigns`, { params: listParams(nextCursor) });
+            setCampaigns(prev => [...prev, ...response.data.items]);
+            setNextCursor(response.data.next_cursor);
+            setTotal(response.data.total);
+        } catch (error) {
+            console.error("Error fetching campaigns:", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const openCreateModal = () => {
         setInitialModalData(null);
         setIsModalOpen(true);
@@ -152,6 +183,7 @@ const Campaigns = () => {
         } else {
             // Create Logic - data is the new campaign
             setCampaigns([data, ...campaigns]);
+            setTotal(prev => prev + 1);
         }
         // Trigger platform check for notifications
         triggerPlatformCheck();
@@ -163,6 +195,7 @@ const Campaigns = () => {
                 if (window.confirm("Are you sure you want to delete this campaign?")) {
                     await axios.delete(`${API_BASE_URL}/campaigns/${id}`);
                     setCampaigns(prev => prev.filter(c => c.id !== id));
+                    setTotal(prev => Math.max(0, prev - 1));
                 }
                 return;
             }
@@ -204,13 +237,8 @@ const Campaigns = () => {
         }
     };
 
-    const filteredCampaigns = campaigns.filter(c => {
-        const name = c.name || '';
-        const status = c.status || '';
-        const matchesSearch = name.toLowerCase().includes(searchTerm.toLowerCase());
-        const matchesStatus = filterStatus === 'All' || status === filterStatus;
-        return matchesSearch && matchesStatus;
-    });
+    // Optimistic status changes can move a card out of the active filter until the next fetch
+    const filteredCampaigns = campaigns.filter(c => filterStatus === 'All' || c.status === filterStatus);
 
     return (
         <div className="space-y-10 animate-in fade-in duration-700">
@@ -282,6 +310,14 @@ const Campaigns = () => {
                             <p className="text-slate-400 font-medium italic">No matching sequences found in the active cluster.</p>
                         </div>
                     )}
+                    {nextCursor && (
+                        <div className="col-span-full flex flex-col items-center gap-3">
+                            <p className="text-xs text-muted font-bold uppercase tracking-widest">Showing {campaigns.length} of {total}</p>
+                            <button onClick={loadMore} disabled={loadingMore} className="btn-primary">
+                                {loadingMore ? <Loader2 className="w-5 h-5 mr-2 animate-spin" /> : null} Load More
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
             {/* Detail Modal */}
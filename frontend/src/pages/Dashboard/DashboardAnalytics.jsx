@@ -17,13 +17,12 @@ const DashboardAnalytics = ({ selectedCampaign, timeRange }) => {
     const fetchData = async () => {
         setLoading(true);
         try {
-            const [statsRes, trendsRes] = await Promise.all([
-                axios.get(`${API_BASE_URL}/dashboard/stats`, { params: { campaign_id: selectedCampaign } }),
-                axios.get(`${API_BASE_URL}/dashboard/trends`, { params: { campaign_id: selectedCampaign, days: timeRange || 30 } })
-            ]);
+            const bundleRes = await axios.get(`${API_BASE_URL}/dashboard/bundle`, {
+                params: { campaign_id: selectedCampaign, days: timeRange || 30, sections: 'stats,trends' }
+            });
 
-            setStats(statsRes.data);
-            setTrends(trendsRes.data);
+            setStats(bundleRes.data.stats);
+            setTrends(bundleRes.data.trends);
         } catch (error) {
             console.error("Error fetching analytics data:", error);
         } finally {
@@ -34,7 +34,7 @@ const DashboardOverview = ({ selectedCampaign, timeRange }) => {
     const [error, setError] = useState(null);
     const [localTimeRange, setLocalTimeRange] = useState(timeRange);
 
-    const generateOverviewInsights = async () => {
+    const generateOverviewInsights = async (campaignStats) => {
         const now = new Date();
         const timestamp = now.toLocaleDateString('en-US', { 
             month: 'short', day: 'numeric', hour: 'numeric', minute: '2-digit', hour12: true 
@@ -75,14 +75,11 @@ const DashboardOverview = ({ selectedCampaign, timeRange }) => {
                 
                 stats = { channels: platformPerformance, total_spend: totalSpend, total_revenue: totalRevenue };
             } else {
-                const response = await axios.get(`${API_BASE_URL}/dashboard/stats`, { 
-                    params: { campaign_id: selectedCampaign } 
-                });
-                stats = response.data;
+                stats = campaignStats || {};
             }
             
             const channels = stats.channels || [];
-            const sortedChannels = channels.sort((a, b) => b.roi - a.roi);
+            const sortedChannels = [...channels].sort((a, b) => b.roi - a.roi);
             const bestPlatform = sortedChannels[0]?.name || 'Facebook';
             const worstPlatform = sortedChannels[sortedChannels.length - 1]?.name || 'Email';
             
@@ -133,19 +130,18 @@ const DashboardOverview = ({ selectedCampaign, timeRange }) => {
 
     useEffect(() => {
         fetchData();
-        generateOverviewInsights();
     }, [selectedCampaign, localTimeRange]);
 
     const fetchData = async () => {
         setLoading(true);
         setError(null);
         try {
-            const [statsRes, trajectoryRes] = await Promise.all([
-                axios.get(`${API_BASE_URL}/dashboard/stats`, { params: { campaign_id: selectedCampaign } }),
-                axios.get(`${API_BASE_URL}/dashboard/revenue-trajectory`, { params: { campaign_id: selectedCampaign, days: localTimeRange } })
-            ]);
-            setStats(statsRes.data);
-            setTrajectory(trajectoryRes.data);
+            const bundleRes = await axios.get(`${API_BASE_URL}/dashboard/bundle`, {
+                params: { campaign_id: selectedCampaign, days: localTimeRange, sections: 'stats,trajectory' }
+            });
+            setStats(bundleRes.data.stats);
+            setTrajectory(bundleRes.data.trajectory);
+            generateOverviewInsights(bundleRes.data.stats);
         } catch (error) {
             console.error("Error fetching dashboard data:", error);
             setError("Failed to load dashboard data. System might be offline.");